@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-15 22:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('todo', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='todo',
+            options={'ordering': ['-created_at']},
+        ),
+        migrations.AddIndex(
+            model_name='todo',
+            index=models.Index(fields=['-created_at'], name='todo_created_at_desc_idx'),
+        ),
+    ]
@@ -7,5 +7,11 @@ class Todo(models.Model):
     is_resolved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['-created_at'], name='todo_created_at_desc_idx'),
+        ]
+
     def __str__(self):
         return self.title
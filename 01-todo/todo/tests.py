@@ -45,3 +45,42 @@ class TodoViewTest(TestCase):
         self.assertEqual(response.status_code, 302)
         self.todo.refresh_from_db()
         self.assertTrue(self.todo.is_resolved)
+
+    def test_todo_list_pagination(self):
+        for i in range(60):
+            Todo.objects.create(title=f"Todo {i}")
+        response = self.client.get(reverse('todo_list'))
+        self.assertEqual(len(response.context['page_obj']), 50)
+        response = self.client.get(reverse('todo_list'), {'page': 2})
+        self.assertEqual(len(response.context['page_obj']), 11)
+
+    def test_todo_export_view(self):
+        response = self.client.get(reverse('todo_export'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn("Test Todo", content)
+
+    def test_todo_list_query_count_is_constant(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('todo_list'))
+        for i in range(20):
+            Todo.objects.create(title=f"Todo {i}")
+        with self.assertNumQueries(2):
+            self.client.get(reverse('todo_list'))
+
+    def test_todo_resolve_view_toggles_back(self):
+        self.client.post(reverse('todo_resolve', args=[self.todo.pk]))
+        self.client.post(reverse('todo_resolve', args=[self.todo.pk]))
+        self.todo.refresh_from_db()
+        self.assertFalse(self.todo.is_resolved)
+
+    def test_todo_resolve_missing_todo(self):
+        response = self.client.post(reverse('todo_resolve', args=[self.todo.pk + 1]))
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(reverse('todo_resolve', args=[self.todo.pk + 1]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_todo_update_missing_todo(self):
+        response = self.client.post(reverse('todo_update', args=[self.todo.pk + 1]), {'title': 'Updated Todo'})
+        self.assertEqual(response.status_code, 404)
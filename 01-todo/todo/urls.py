@@ -7,4 +7,5 @@ urlpatterns = [
     path('update/<int:pk>/', views.todo_update, name='todo_update'),
     path('delete/<int:pk>/', views.todo_delete, name='todo_delete'),
     path('resolve/<int:pk>/', views.todo_resolve, name='todo_resolve'),
+    path('export/', views.todo_export, name='todo_export'),
 ]
@@ -1,9 +1,37 @@
+import csv
+from itertools import chain
+
+from django.core.paginator import Paginator
+from django.db.models import F
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from .models import Todo
 
+TODOS_PER_PAGE = 50
+EXPORT_CHUNK_SIZE = 200
+
+class EchoBuffer:
+    def write(self, value):
+        return value
+
 def todo_list(request):
-    todos = Todo.objects.all().order_by('-created_at')
-    return render(request, 'todo/todo_list.html', {'todos': todos})
+    todos = Todo.objects.all()
+    page_obj = Paginator(todos, TODOS_PER_PAGE).get_page(request.GET.get('page', 1))
+    return render(request, 'todo/todo_list.html', {'todos': page_obj, 'page_obj': page_obj})
+
+def todo_export(request):
+    todos = Todo.objects.only(
+        'id', 'title', 'is_resolved', 'created_at', 'due_date'
+    )
+    writer = csv.writer(EchoBuffer())
+    header = writer.writerow(['id', 'title', 'is_resolved', 'created_at', 'due_date'])
+    rows = (
+        writer.writerow([todo.id, todo.title, todo.is_resolved, todo.created_at, todo.due_date or ''])
+        for todo in todos.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    response = StreamingHttpResponse(chain([header], rows), content_type='text/csv')
+    response['Content-Disposition'] = 'attachment; filename="todos.csv"'
+    return response
 
 def todo_create(request):
     if request.method == 'POST':
@@ -16,17 +44,18 @@ def todo_create(request):
     return render(request, 'todo/todo_form.html')
 
 def todo_update(request, pk):
-    todo = get_object_or_404(Todo, pk=pk)
     if request.method == 'POST':
         title = request.POST.get('title')
         description = request.POST.get('description')
         due_date = request.POST.get('due_date')
         if title:
-            todo.title = title
-            todo.description = description
-            todo.due_date = due_date if due_date else None
-            todo.save()
+            updated = Todo.objects.filter(pk=pk).update(
+                title=title, description=description, due_date=due_date if due_date else None
+            )
+            if not updated:
+                raise Http404
             return redirect('todo_list')
+    todo = get_object_or_404(Todo, pk=pk)
     return render(request, 'todo/todo_form.html', {'todo': todo})
 
 def todo_delete(request, pk):
@@ -37,9 +66,9 @@ def todo_delete(request, pk):
     return render(request, 'todo/todo_confirm_delete.html', {'todo': todo})
 
 def todo_resolve(request, pk):
-    todo = get_object_or_404(Todo, pk=pk)
     if request.method == 'POST':
-        todo.is_resolved = not todo.is_resolved
-        todo.save()
-        return redirect('todo_list')
+        if not Todo.objects.filter(pk=pk).update(is_resolved=~F('is_resolved')):
+            raise Http404
+    else:
+        get_object_or_404(Todo, pk=pk)
     return redirect('todo_list')
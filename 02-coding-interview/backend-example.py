@@ -3,14 +3,23 @@ FastAPI Backend Example for Online Coding Interview Platform
 This is a simplified example showing how to implement the OpenAPI spec with FastAPI
 """
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, status
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from fastapi.responses import ORJSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any, Set, AsyncIterator, Callable
+from dataclasses import dataclass, field
 from datetime import datetime
+import os
 import uuid
 import asyncio
+import subprocess
+import tempfile
 import json
+import hashlib
+import orjson
+import msgpack
 
 # ============================================================================
 # PYDANTIC MODELS (matching OpenAPI schemas)
@@ -18,6 +27,7 @@ import json
 
 class CreateSessionRequest(BaseModel):
     """Request model for creating a new session"""
+    model_config = ConfigDict(strict=True)  # No type coercion on input
     hostName: Optional[str] = Field(None, max_length=50, description="Display name of host")
     sessionName: Optional[str] = Field(None, max_length=100, description="Session title")
     initialLanguage: str = Field("javascript", description="Starting language")
@@ -44,6 +54,7 @@ class Language(BaseModel):
 
 class ExecuteCodeRequest(BaseModel):
     """Request model for code execution"""
+    model_config = ConfigDict(strict=True)  # No type coercion on input
     code: str = Field(..., max_length=50000, description="Code to execute")
     language: str = Field(..., description="Programming language")
     stdin: str = Field("", description="Standard input")
@@ -70,9 +81,31 @@ app = FastAPI(
     description="Backend API for real-time collaborative coding interviews",
     version="1.0.0",
     docs_url="/docs",      # Swagger UI at http://localhost:8000/docs
-    redoc_url="/redoc"     # ReDoc at http://localhost:8000/redoc
+    redoc_url="/redoc",    # ReDoc at http://localhost:8000/redoc
+    default_response_class=ORJSONResponse  # Serialize responses with orjson
 )
 
+class ORJSONRequest(Request):
+    """Request that parses JSON bodies with orjson instead of stdlib json"""
+    
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = orjson.loads(await self.body())
+        return self._json
+
+class ORJSONRoute(APIRoute):
+    """Route that hands endpoints an ORJSONRequest"""
+    
+    def get_route_handler(self) -> Callable:
+        original_route_handler = super().get_route_handler()
+        
+        async def custom_route_handler(request: Request) -> Response:
+            return await original_route_handler(ORJSONRequest(request.scope, request.receive))
+        
+        return custom_route_handler
+
+app.router.route_class = ORJSONRoute
+
 # ============================================================================
 # CORS CONFIGURATION (allows React frontend to connect)
 # ============================================================================
@@ -90,14 +123,124 @@ app.add_middleware(
 )
 
 # ============================================================================
-# IN-MEMORY STORAGE (replace with database in production)
+# SESSION STORAGE (in-memory by default, Redis when REDIS_URL is set)
 # ============================================================================
 
+@dataclass(slots=True)
+class SessionState:
+    """State of an active session (slots keep per-session memory and attribute access cheap)"""
+    session_id: str
+    join_url: str
+    created_at: datetime
+    host_name: str
+    session_name: Optional[str] = None
+    status: str = "active"
+    participant_count: int = 0
+    current_code: str = ""
+    current_language: str = "javascript"
+    max_participants: int = 5
+    participants: List[Dict[str, Any]] = field(default_factory=list)
+    execution_history: List[Dict[str, Any]] = field(default_factory=list)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to the camelCase shape used by the API"""
+        return {
+            "sessionId": self.session_id,
+            "joinUrl": self.join_url,
+            "createdAt": self.created_at,
+            "hostName": self.host_name,
+            "sessionName": self.session_name,
+            "status": self.status,
+            "participantCount": self.participant_count,
+            "participants": self.participants,
+            "currentCode": self.current_code,
+            "currentLanguage": self.current_language,
+            "maxParticipants": self.max_participants,
+            "executionHistory": self.execution_history
+        }
+
 # Store active sessions
-sessions_db: Dict[str, Dict[str, Any]] = {}
+sessions_db: Dict[str, SessionState] = {}
 
 # Store WebSocket connections for each session
-session_connections: Dict[str, List[WebSocket]] = {}
+# (always per-process; with Redis, other workers' broadcasts arrive via pub/sub)
+session_connections: Dict[str, Set[WebSocket]] = {}
+
+# Connections that opted into MessagePack binary frames (?format=msgpack)
+msgpack_connections: Set[WebSocket] = set()
+
+# Set REDIS_URL to share sessions between uvicorn workers (e.g. --workers 4)
+REDIS_URL = os.getenv("REDIS_URL")
+redis_client = None
+if REDIS_URL:
+    import redis.asyncio as aioredis
+    redis_client = aioredis.from_url(REDIS_URL)
+
+# Identifies this worker so it can skip its own pub/sub messages
+WORKER_ID = uuid.uuid4().hex
+
+def _session_key(session_id: str) -> str:
+    return f"sess:{session_id}"
+
+def _channel(session_id: str) -> str:
+    return f"chan:{session_id}"
+
+async def save_session(session: SessionState):
+    """Store a session"""
+    if redis_client is None:
+        sessions_db[session.session_id] = session
+        return
+    
+    # Each field is stored JSON-encoded in a Redis hash
+    await redis_client.hset(_session_key(session.session_id), mapping={
+        name: orjson.dumps(getattr(session, name))
+        for name in SessionState.__slots__
+    })
+
+async def load_session(session_id: str) -> Optional[SessionState]:
+    """Get a session, or None if it doesn't exist"""
+    if redis_client is None:
+        return sessions_db.get(session_id)
+    
+    fields = await redis_client.hgetall(_session_key(session_id))
+    if not fields:
+        return None
+    values = {name.decode(): orjson.loads(value) for name, value in fields.items()}
+    values["created_at"] = datetime.fromisoformat(values["created_at"])
+    return SessionState(**values)
+
+async def iter_sessions() -> AsyncIterator[SessionState]:
+    """Yield stored sessions one at a time so callers can stop early"""
+    if redis_client is None:
+        for session in sessions_db.values():
+            yield session
+        return
+    
+    async for key in redis_client.scan_iter(match=_session_key("*")):
+        session = await load_session(key.decode().split(":", 1)[1])
+        if session is not None:
+            yield session
+
+async def update_session(session_id: str, **changes: Any):
+    """Update individual fields of a session"""
+    if redis_client is None:
+        session = sessions_db[session_id]
+        for name, value in changes.items():
+            setattr(session, name, value)
+        return
+    
+    await redis_client.hset(_session_key(session_id), mapping={
+        name: orjson.dumps(value) for name, value in changes.items()
+    })
+
+async def change_participant_count(session_id: str, delta: int) -> int:
+    """Atomically adjust the participant count and return the new value"""
+    if redis_client is None:
+        session = sessions_db[session_id]
+        session.participant_count += delta
+        return session.participant_count
+    
+    return await redis_client.hincrby(_session_key(session_id), "participant_count", delta)
 
 # Supported languages
 LANGUAGES = [
@@ -168,6 +311,42 @@ int main() {
     }
 ]
 
+# Index languages by id for O(1) lookups
+LANGUAGES_BY_ID = {lang["id"]: lang for lang in LANGUAGES}
+
+# The language list never changes, so serialize it (and its ETag) once
+LANGUAGES_JSON = orjson.dumps({"languages": LANGUAGES})
+LANGUAGES_ETAG = f'"{hashlib.md5(LANGUAGES_JSON).hexdigest()}"'
+
+# ============================================================================
+# CACHED CLOCK
+# ============================================================================
+
+# ISO timestamp refreshed by a background task so messages don't each pay for isoformat()
+CLOCK_RESOLUTION_SECONDS = 0.1
+_now_iso = datetime.now().isoformat()
+
+def now_iso() -> str:
+    """Get the current time as an ISO string (accurate to CLOCK_RESOLUTION_SECONDS)"""
+    return _now_iso
+
+async def _refresh_clock():
+    """Keep the cached ISO timestamp up to date"""
+    global _now_iso
+    while True:
+        _now_iso = datetime.now().isoformat()
+        await asyncio.sleep(CLOCK_RESOLUTION_SECONDS)
+
+@app.on_event("startup")
+async def start_clock():
+    """Start the clock refresher when the app starts"""
+    app.state.clock_task = asyncio.create_task(_refresh_clock())
+
+@app.on_event("shutdown")
+async def stop_clock():
+    """Stop the clock refresher"""
+    app.state.clock_task.cancel()
+
 # ============================================================================
 # REST API ENDPOINTS
 # ============================================================================
@@ -177,7 +356,7 @@ async def health_check():
     """Check API health status"""
     return {
         "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": now_iso(),
         "version": "1.0.0",
         "services": {
             "database": "connected",
@@ -196,35 +375,31 @@ async def create_session(request: CreateSessionRequest = None):
     # Generate unique session ID
     session_id = str(uuid.uuid4())[:12]  # Use first 12 chars for shorter URLs
     
-    # Create session object
-    session = {
-        "sessionId": session_id,
-        "joinUrl": f"http://localhost:3000/session/{session_id}",
-        "createdAt": datetime.now(),
-        "hostName": request.hostName if request else "Anonymous Host",
-        "sessionName": request.sessionName if request else None,
-        "status": "active",
-        "participantCount": 0,
-        "participants": [],
-        "currentCode": LANGUAGES[0]["defaultCode"],  # Default to JavaScript
-        "currentLanguage": request.initialLanguage if request else "javascript",
-        "maxParticipants": request.maxParticipants if request else 5,
-        "executionHistory": []
-    }
+    # Build the response once; the data is server-generated so skip re-validation
+    response = SessionResponse.model_construct(
+        sessionId=session_id,
+        joinUrl=f"http://localhost:3000/session/{session_id}",
+        createdAt=datetime.now(),
+        hostName=request.hostName if request else "Anonymous Host",
+        status="active",
+        participantCount=0
+    )
     
     # Store in database
-    sessions_db[session_id] = session
-    session_connections[session_id] = []
+    await save_session(SessionState(
+        session_id=session_id,
+        join_url=response.joinUrl,
+        created_at=response.createdAt,
+        host_name=response.hostName,
+        session_name=request.sessionName if request else None,
+        status=response.status,
+        participant_count=response.participantCount,
+        current_code=LANGUAGES[0]["defaultCode"],  # Default to JavaScript
+        current_language=request.initialLanguage if request else "javascript",
+        max_participants=request.maxParticipants if request else 5
+    ))
     
-    # Return response
-    return SessionResponse(
-        sessionId=session_id,
-        joinUrl=session["joinUrl"],
-        createdAt=session["createdAt"],
-        hostName=session["hostName"],
-        status=session["status"],
-        participantCount=session["participantCount"]
-    )
+    return response
 
 @app.get("/api/v1/sessions/{session_id}")
 async def get_session(session_id: str):
@@ -233,17 +408,19 @@ async def get_session(session_id: str):
     
     Called when a user joins a session to get the current state
     """
-    if session_id not in sessions_db:
+    session = await load_session(session_id)
+    if session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
                 "error": "SESSION_NOT_FOUND",
                 "message": f"Session {session_id} does not exist",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": now_iso()
             }
         )
     
-    return sessions_db[session_id]
+    # Returning the response directly skips FastAPI's jsonable_encoder walk
+    return ORJSONResponse(session.to_dict())
 
 @app.get("/api/v1/sessions")
 async def list_sessions(status: str = "active", limit: int = 20):
@@ -252,108 +429,95 @@ async def list_sessions(status: str = "active", limit: int = 20):
     
     In production, this would be restricted to authenticated admins
     """
-    # Filter sessions by status
+    # Filter sessions by status, stopping as soon as we have enough
     filtered_sessions = []
-    for session in sessions_db.values():
-        if status == "all" or session["status"] == status:
+    async for session in iter_sessions():
+        if len(filtered_sessions) >= limit:
+            break
+        if status == "all" or session.status == status:
             filtered_sessions.append({
-                "sessionId": session["sessionId"],
-                "createdAt": session["createdAt"],
-                "hostName": session["hostName"],
-                "participantCount": session["participantCount"],
-                "status": session["status"]
+                "sessionId": session.session_id,
+                "createdAt": session.created_at,
+                "hostName": session.host_name,
+                "participantCount": session.participant_count,
+                "status": session.status
             })
     
-    # Apply limit
-    filtered_sessions = filtered_sessions[:limit]
-    
     return {
         "sessions": filtered_sessions,
         "total": len(filtered_sessions)
     }
 
 @app.get("/api/v1/languages")
-async def list_languages():
+async def list_languages(request: Request):
     """
     Get list of supported programming languages
     
-    Used to populate the language dropdown in the editor
+    Used to populate the language dropdown in the editor.
+    Returns 304 when the client already has the current list.
     """
-    return {"languages": LANGUAGES}
+    headers = {"ETag": LANGUAGES_ETAG}
+    if request.headers.get("if-none-match") == LANGUAGES_ETAG:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=LANGUAGES_JSON, media_type="application/json", headers=headers)
 
 @app.get("/api/v1/languages/{language_id}/template")
 async def get_language_template(language_id: str):
     """Get the default template for a specific language"""
-    for lang in LANGUAGES:
-        if lang["id"] == language_id:
-            return {
-                "languageId": language_id,
-                "template": lang["defaultCode"]
-            }
+    lang = LANGUAGES_BY_ID.get(language_id)
+    if lang is not None:
+        return {
+            "languageId": language_id,
+            "template": lang["defaultCode"]
+        }
     
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
         detail={
             "error": "LANGUAGE_NOT_FOUND",
             "message": f"Language {language_id} is not supported",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
     )
 
-@app.post("/api/v1/sessions/{session_id}/execute", response_model=ExecutionResponse)
-async def execute_code(session_id: str, request: ExecuteCodeRequest):
-    """
-    Execute code for a session
-    
-    NOTE: This is a simplified example. In production, you would:
-    1. Use Docker containers for sandboxing
-    2. Implement proper resource limits
-    3. Use a queue system for execution
-    4. Store results in a database
-    """
-    
-    if session_id not in sessions_db:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail={"error": "SESSION_NOT_FOUND", "message": "Session not found"}
-        )
-    
-    # Simulate code execution (replace with actual execution logic)
-    # In production, you'd use subprocess with timeout, Docker, or a service like Judge0
-    
-    if request.language == "python":
-        # Example Python execution (UNSAFE - for demonstration only!)
-        try:
-            import subprocess
-            import tempfile
-            
-            # Write code to temporary file
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as f:
-                f.write(request.code)
-                temp_file = f.name
-            
-            # Execute with timeout
-            result = subprocess.run(
-                ['python', temp_file],
-                capture_output=True,
-                text=True,
-                timeout=request.timeLimit / 1000,  # Convert ms to seconds
-                input=request.stdin
-            )
-            
-            return ExecutionResponse(
-                sessionId=session_id,
-                language=request.language,
-                stdout=result.stdout[:5000],  # Limit output size
-                stderr=result.stderr[:5000],
-                exitCode=result.returncode,
-                duration=100,  # Would measure actual duration
-                success=result.returncode == 0,
-                error=None if result.returncode == 0 else "Runtime error",
-                timestamp=datetime.now()
-            )
+# Cap concurrent child processes; extra submissions wait their turn in FIFO order
+MAX_CONCURRENT_EXECUTIONS = 4
+execution_slots = asyncio.Semaphore(MAX_CONCURRENT_EXECUTIONS)
+
+# Write source files to tmpfs when available to skip disk I/O
+SOURCE_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+async def run_python(session_id: str, request: ExecuteCodeRequest) -> ExecutionResponse:
+    """Example Python execution (UNSAFE - for demonstration only!)"""
+    try:
+        # Write code to a temporary file, kept in RAM when /dev/shm is available.
+        # The file is removed when the block exits, even if execution fails.
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', dir=SOURCE_DIR) as f:
+            f.write(request.code)
+            f.flush()
             
-        except subprocess.TimeoutExpired:
+            # Wait for a free execution slot, then run as an asyncio subprocess
+            # so the event loop keeps serving other clients
+            timed_out = False
+            async with execution_slots:
+                process = await asyncio.create_subprocess_exec(
+                    'python', f.name,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE
+                )
+                
+                try:
+                    stdout, stderr = await asyncio.wait_for(
+                        process.communicate(input=request.stdin.encode()),
+                        timeout=request.timeLimit / 1000  # Convert ms to seconds
+                    )
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    timed_out = True
+        
+        if timed_out:
             return ExecutionResponse(
                 sessionId=session_id,
                 language=request.language,
@@ -365,20 +529,34 @@ async def execute_code(session_id: str, request: ExecuteCodeRequest):
                 error=f"Execution timed out after {request.timeLimit}ms",
                 timestamp=datetime.now()
             )
-        except Exception as e:
-            return ExecutionResponse(
-                sessionId=session_id,
-                language=request.language,
-                stdout="",
-                stderr=str(e),
-                exitCode=1,
-                duration=0,
-                success=False,
-                error="Execution failed",
-                timestamp=datetime.now()
-            )
-    
-    # For other languages, return a mock response
+        
+        return ExecutionResponse(
+            sessionId=session_id,
+            language=request.language,
+            stdout=stdout.decode(errors="replace")[:5000],  # Limit output size
+            stderr=stderr.decode(errors="replace")[:5000],
+            exitCode=process.returncode,
+            duration=100,  # Would measure actual duration
+            success=process.returncode == 0,
+            error=None if process.returncode == 0 else "Runtime error",
+            timestamp=datetime.now()
+        )
+        
+    except Exception as e:
+        return ExecutionResponse(
+            sessionId=session_id,
+            language=request.language,
+            stdout="",
+            stderr=str(e),
+            exitCode=1,
+            duration=0,
+            success=False,
+            error="Execution failed",
+            timestamp=datetime.now()
+        )
+
+async def run_mock(session_id: str, request: ExecuteCodeRequest) -> ExecutionResponse:
+    """Return a mock response for languages without a real executor"""
     return ExecutionResponse(
         sessionId=session_id,
         language=request.language,
@@ -391,10 +569,167 @@ async def execute_code(session_id: str, request: ExecuteCodeRequest):
         timestamp=datetime.now()
     )
 
+# Executors keyed by language id; anything else falls back to run_mock
+EXECUTORS = {
+    "python": run_python,
+}
+
+@app.post("/api/v1/sessions/{session_id}/execute", response_model=ExecutionResponse)
+async def execute_code(session_id: str, request: ExecuteCodeRequest):
+    """
+    Execute code for a session
+    
+    NOTE: This is a simplified example. In production, you would:
+    1. Use Docker containers for sandboxing
+    2. Implement proper resource limits
+    3. Use a queue system for execution
+    4. Store results in a database
+    """
+    
+    if await load_session(session_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail={"error": "SESSION_NOT_FOUND", "message": "Session not found"}
+        )
+    
+    # Simulate code execution (replace with actual execution logic)
+    # In production, you'd use subprocess with timeout, Docker, or a service like Judge0
+    executor = EXECUTORS.get(request.language, run_mock)
+    return await executor(session_id, request)
+
 # ============================================================================
 # WEBSOCKET ENDPOINT
 # ============================================================================
 
+# Window for coalescing rapid code_update messages (editors fire on every keystroke)
+CODE_UPDATE_BATCH_SECONDS = 0.02
+
+async def broadcast(
+    session_id: str,
+    message_type: str,
+    data: Dict[str, Any],
+    exclude: Optional[WebSocket] = None
+):
+    """
+    Send a message to every connection in a session
+    
+    The message is timestamped and encoded once, then the same text frame is
+    sent to every recipient concurrently so one slow client can't hold up the rest
+    """
+    message = {
+        "type": message_type,
+        "data": data,
+        "timestamp": now_iso()
+    }
+    encoded = orjson.dumps(message).decode()
+    
+    # Let the other workers deliver to their own connections
+    if redis_client is not None:
+        await redis_client.publish(
+            _channel(session_id),
+            orjson.dumps({"worker": WORKER_ID, "message": encoded})
+        )
+    
+    await send_to_local_connections(session_id, encoded, exclude, message)
+
+
+async def send_to_local_connections(
+    session_id: str,
+    encoded: str,
+    exclude: Optional[WebSocket] = None,
+    message: Optional[Dict[str, Any]] = None
+):
+    """
+    Send an encoded message to this worker's connections in a session
+    
+    Pass the message dict too when it is at hand, so MessagePack recipients
+    are served without parsing the JSON back; relayed messages only have
+    the JSON text.
+    """
+    connections = session_connections.get(session_id, set())
+    recipients = [c for c in connections if c is not exclude]
+    if not recipients:
+        return
+    
+    # Encode as MessagePack only if some recipient asked for it
+    packed = None
+    if not msgpack_connections.isdisjoint(recipients):
+        packed = msgpack.packb(message if message is not None else orjson.loads(encoded))
+    
+    results = await asyncio.gather(
+        *(
+            connection.send_bytes(packed) if connection in msgpack_connections
+            else connection.send_text(encoded)
+            for connection in recipients
+        ),
+        return_exceptions=True
+    )
+    
+    # Drop sockets that failed so later broadcasts don't keep retrying them
+    for connection, result in zip(recipients, results):
+        if isinstance(result, Exception):
+            connections.discard(connection)
+            msgpack_connections.discard(connection)
+
+
+async def send_message(websocket: WebSocket, message: Dict[str, Any]):
+    """Send a message to one client in the format it asked for"""
+    if websocket in msgpack_connections:
+        await websocket.send_bytes(msgpack.packb(message))
+    else:
+        await websocket.send_json(message)
+
+
+async def receive_message(websocket: WebSocket) -> Dict[str, Any]:
+    """
+    Receive a message from a client in the format it asked for.
+    
+    Raises:
+        ValueError: If the frame is the wrong kind for the connection or
+            does not decode to a message object
+    """
+    try:
+        if websocket in msgpack_connections:
+            data = msgpack.unpackb(await websocket.receive_bytes())
+        else:
+            data = await websocket.receive_json()
+    except (KeyError, TypeError, ValueError) as e:
+        # KeyError/TypeError: text frame on a binary socket or vice versa
+        raise ValueError("Message could not be decoded") from e
+    if not isinstance(data, dict):
+        raise ValueError("Message must be an object")
+    return data
+
+
+async def relay_broadcasts():
+    """Forward broadcasts published by other workers to local connections"""
+    pubsub = redis_client.pubsub()
+    await pubsub.psubscribe(_channel("*"))
+    async for item in pubsub.listen():
+        if item["type"] != "pmessage":
+            continue
+        envelope = orjson.loads(item["data"])
+        if envelope["worker"] == WORKER_ID:
+            continue
+        session_id = item["channel"].decode().split(":", 1)[1]
+        await send_to_local_connections(session_id, envelope["message"])
+
+
+@app.on_event("startup")
+async def start_relay():
+    """Start relaying cross-worker broadcasts when Redis is configured"""
+    if redis_client is not None:
+        app.state.relay_task = asyncio.create_task(relay_broadcasts())
+
+
+@app.on_event("shutdown")
+async def stop_relay():
+    """Stop relaying and close the Redis connection"""
+    if redis_client is not None:
+        app.state.relay_task.cancel()
+        await redis_client.close()
+
+
 @app.websocket("/ws/sessions/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """
@@ -405,10 +740,17 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     - Code synchronization
     - Language changes
     - Execution results broadcasting
+    
+    Connect with ?format=msgpack to exchange MessagePack binary frames
+    instead of JSON text (smaller and faster to encode for large code buffers).
     """
+    if websocket.query_params.get("format") == "msgpack":
+        msgpack_connections.add(websocket)
     
     # Check if session exists
-    if session_id not in sessions_db:
+    session = await load_session(session_id)
+    if session is None:
+        msgpack_connections.discard(websocket)
         await websocket.accept()
         await websocket.send_json({
             "type": "error",
@@ -416,7 +758,7 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 "code": "SESSION_NOT_FOUND",
                 "message": f"Session {session_id} does not exist"
             },
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         })
         await websocket.close()
         return
@@ -426,80 +768,91 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
     
     # Add to session connections
     if session_id not in session_connections:
-        session_connections[session_id] = []
-    session_connections[session_id].append(websocket)
+        session_connections[session_id] = set()
+    session_connections[session_id].add(websocket)
     
     # Update participant count
-    sessions_db[session_id]["participantCount"] = len(session_connections[session_id])
+    participant_count = await change_participant_count(session_id, 1)
     
     # Send current session state to new user
-    await websocket.send_json({
+    await send_message(websocket, {
         "type": "session_state",
         "data": {
             "sessionId": session_id,
-            "code": sessions_db[session_id]["currentCode"],
-            "language": sessions_db[session_id]["currentLanguage"],
-            "participantCount": sessions_db[session_id]["participantCount"],
-            "participants": sessions_db[session_id]["participants"]
+            "code": session.current_code,
+            "language": session.current_language,
+            "participantCount": participant_count,
+            "participants": session.participants
         },
-        "timestamp": datetime.now().isoformat()
+        "timestamp": now_iso()
     })
     
     # Broadcast user joined to all other participants
-    for connection in session_connections[session_id]:
-        if connection != websocket:
-            try:
-                await connection.send_json({
-                    "type": "user_joined",
-                    "data": {
-                        "sessionId": session_id,
-                        "participantCount": sessions_db[session_id]["participantCount"]
-                    },
-                    "timestamp": datetime.now().isoformat()
-                })
-            except:
-                pass
+    await broadcast(session_id, "user_joined", {
+        "sessionId": session_id,
+        "participantCount": participant_count
+    }, exclude=websocket)
+    
+    # Code updates arriving within CODE_UPDATE_BATCH_SECONDS are coalesced:
+    # only the latest buffer is stored and broadcast
+    pending_code_update: Optional[Dict[str, Any]] = None
+    flush_task: Optional[asyncio.Task] = None
+    
+    async def flush_code_update():
+        nonlocal pending_code_update
+        if pending_code_update is None:
+            return
+        message_data, pending_code_update = pending_code_update, None
+        
+        # Update session code
+        await update_session(session_id, current_code=message_data.get("code", ""))
+        
+        # Broadcast to all other participants
+        await broadcast(session_id, "code_update", message_data, exclude=websocket)
+    
+    async def flush_code_update_later():
+        await asyncio.sleep(CODE_UPDATE_BATCH_SECONDS)
+        # Edits that arrive while a flush is storing/broadcasting see this task
+        # still running and schedule nothing, so keep flushing until none is left
+        while pending_code_update is not None:
+            await flush_code_update()
     
     try:
         # Handle incoming messages
         while True:
-            # Receive message from client
-            data = await websocket.receive_json()
+            # Receive message from client; undecodable frames get an error reply
+            try:
+                data = await receive_message(websocket)
+            except ValueError as e:
+                await send_message(websocket, {
+                    "type": "error",
+                    "data": {"code": "INVALID_MESSAGE", "message": str(e)},
+                    "timestamp": now_iso()
+                })
+                continue
             message_type = data.get("type")
             message_data = data.get("data", {})
             
-            # Handle different message types
             if message_type == "code_update":
-                # Update session code
-                sessions_db[session_id]["currentCode"] = message_data.get("code", "")
-                
-                # Broadcast to all other participants
-                for connection in session_connections[session_id]:
-                    if connection != websocket:
-                        try:
-                            await connection.send_json({
-                                "type": "code_update",
-                                "data": message_data,
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        except:
-                            pass
+                # Keep only the newest code and schedule a flush if none is pending
+                pending_code_update = message_data
+                if flush_task is None or flush_task.done():
+                    flush_task = asyncio.create_task(flush_code_update_later())
+                continue
             
-            elif message_type == "language_change":
+            # Send any pending code first so other messages stay in order
+            await flush_code_update()
+            
+            # Handle different message types
+            if message_type == "language_change":
                 # Update session language
-                sessions_db[session_id]["currentLanguage"] = message_data.get("language", "javascript")
+                await update_session(
+                    session_id,
+                    current_language=message_data.get("language", "javascript")
+                )
                 
                 # Broadcast to all other participants
-                for connection in session_connections[session_id]:
-                    if connection != websocket:
-                        try:
-                            await connection.send_json({
-                                "type": "language_change",
-                                "data": message_data,
-                                "timestamp": datetime.now().isoformat()
-                            })
-                        except:
-                            pass
+                await broadcast(session_id, "language_change", message_data, exclude=websocket)
             
             elif message_type == "execute_code":
                 # Execute code and broadcast result
@@ -513,37 +866,33 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
                 }
                 
                 # Broadcast execution result to all participants
-                for connection in session_connections[session_id]:
-                    try:
-                        await connection.send_json({
-                            "type": "execution_result",
-                            "data": {
-                                "sessionId": session_id,
-                                "result": execution_result
-                            },
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    except:
-                        pass
+                await broadcast(session_id, "execution_result", {
+                    "sessionId": session_id,
+                    "result": execution_result
+                })
     
     except WebSocketDisconnect:
-        # Remove from connections
-        session_connections[session_id].remove(websocket)
-        sessions_db[session_id]["participantCount"] = len(session_connections[session_id])
+        pass
+    
+    finally:
+        # Runs however the loop ends, so the socket never stays registered
+        session_connections[session_id].discard(websocket)
+        msgpack_connections.discard(websocket)
+        
+        # Deliver the last code update before announcing the departure.
+        # Flush it now, then let any scheduled flush finish rather than
+        # cancelling it: one already broadcasting holds the update itself.
+        await flush_code_update()
+        if flush_task is not None:
+            await flush_task
+        
+        participant_count = await change_participant_count(session_id, -1)
         
         # Broadcast user left to remaining participants
-        for connection in session_connections[session_id]:
-            try:
-                await connection.send_json({
-                    "type": "user_left",
-                    "data": {
-                        "sessionId": session_id,
-                        "participantCount": sessions_db[session_id]["participantCount"]
-                    },
-                    "timestamp": datetime.now().isoformat()
-                })
-            except:
-                pass
+        await broadcast(session_id, "user_left", {
+            "sessionId": session_id,
+            "participantCount": participant_count
+        })
 
 # ============================================================================
 # MAIN ENTRY POINT
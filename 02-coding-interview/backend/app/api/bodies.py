@@ -0,0 +1,58 @@
+"""
+Request Body Helpers
+
+Shared helpers for validating JSON request bodies straight from bytes.
+"""
+
+from typing import Any, Callable, Coroutine, Dict, Type, TypeVar
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, ValidationError
+
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def json_body(model: Type[ModelT]) -> Callable[[Request], Coroutine[Any, Any, ModelT]]:
+    """
+    Build a dependency that validates the raw request body as a model.
+
+    FastAPI normally parses the body into a dict before validating it;
+    model_validate_json skips that intermediate dict and parses in
+    pydantic-core. Errors are re-raised as RequestValidationError with
+    "body" locations so the 422 response keeps its usual shape.
+
+    Args:
+        model: Request model to validate against
+
+    Returns:
+        Async dependency returning the validated model
+    """
+    async def parse(request: Request) -> ModelT:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors()]
+            )
+
+    return parse
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Describe a json_body model as the route's request body in OpenAPI.
+
+    Args:
+        model: Request model validated by json_body
+
+    Returns:
+        Value for the route's openapi_extra argument
+    """
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": model.model_json_schema()}}
+        }
+    }
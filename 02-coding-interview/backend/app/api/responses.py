@@ -0,0 +1,30 @@
+"""
+Response Helpers
+
+Shared helpers for returning already-built response models from routes.
+"""
+
+from fastapi import Response
+from pydantic import BaseModel
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """
+    Serialize a response model straight to JSON bytes.
+    
+    Returning a Response skips FastAPI's response validation and
+    jsonable_encoder pass; the route's response_model still documents
+    the shape in OpenAPI.
+    
+    Args:
+        model: Response model built from trusted server-side data
+        status_code: HTTP status code to send
+        
+    Returns:
+        JSON response with the model's serialized body
+    """
+    return Response(
+        content=model.model_dump_json(),
+        status_code=status_code,
+        media_type="application/json"
+    )
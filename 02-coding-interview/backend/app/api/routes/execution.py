@@ -4,8 +4,9 @@ Code Execution API Routes
 Endpoints for executing code safely.
 """
 
+import asyncio
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status
 
 from app.schemas.execution import ExecuteCodeRequest, ExecutionResponse
 from app.services.session_manager import session_manager
@@ -13,6 +14,8 @@ from app.services.code_executor import code_executor
 from app.models.domain import ExecutionResult
 from app.core.exceptions import RateLimitExceededException
 from app.core.config import settings
+from app.api.bodies import json_body, json_body_openapi
+from app.api.responses import model_response
 
 
 # Create a router for execution endpoints
@@ -26,11 +29,12 @@ router = APIRouter(
     "/{session_id}/execute",
     response_model=ExecutionResponse,
     summary="Execute code",
-    description="Executes code for a session with timeout and resource limits"
+    description="Executes code for a session with timeout and resource limits",
+    openapi_extra=json_body_openapi(ExecuteCodeRequest)
 )
 async def execute_code(
     session_id: str,
-    request: ExecuteCodeRequest
+    request: ExecuteCodeRequest = Depends(json_body(ExecuteCodeRequest))
 ):
     """
     Execute code safely with resource limits.
@@ -56,12 +60,11 @@ async def execute_code(
         500: If execution fails
     """
     # Check session exists
-    try:
-        session = session_manager.get_session(session_id)
-    except Exception as e:
+    session = session_manager.get_session(session_id)
+    if session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
+            detail=f"Session {session_id} does not exist"
         )
     
     # Check rate limit
@@ -70,15 +73,16 @@ async def execute_code(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail={
                 "error": "RATE_LIMIT_EXCEEDED",
-                "message": f"Rate limit exceeded: {settings.rate_limit_executions_per_minute} executions per minute",
+                "message": settings.rate_limit_error_message,
                 "limit": settings.rate_limit_executions_per_minute,
                 "window": "1 minute"
             }
         )
     
-    # Execute the code
+    # Execute the code in a worker thread so the event loop stays free
     try:
-        stdout, stderr, exit_code, duration_ms, error = code_executor.execute(
+        stdout, stderr, exit_code, duration_ms, error = await asyncio.to_thread(
+            code_executor.execute,
             code=request.code,
             language=request.language,
             stdin=request.stdin,
@@ -101,17 +105,19 @@ async def execute_code(
         # Add to session history
         session_manager.add_execution_result(session_id, result)
         
-        # Return response
-        return ExecutionResponse(
-            session_id=session_id,
-            language=request.language,
-            stdout=stdout,
-            stderr=stderr,
-            exit_code=exit_code,
-            duration=duration_ms,
-            success=result.success,
-            error=error,
-            timestamp=result.timestamp
+        # Return response; every field comes from the executor, so skip validation
+        return model_response(
+            ExecutionResponse.model_construct(
+                session_id=session_id,
+                language=request.language,
+                stdout=stdout,
+                stderr=stderr,
+                exit_code=exit_code,
+                duration=duration_ms,
+                success=result.success,
+                error=error,
+                timestamp=result.timestamp
+            )
         )
         
     except Exception as e:
@@ -9,6 +9,7 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 
 from app.core.config import settings
+from app.api.responses import model_response
 
 
 # Create a router for health endpoints
@@ -33,13 +34,15 @@ async def health_check():
     
     Returns basic service information and status of components.
     """
-    return HealthResponse(
-        status="healthy",
-        timestamp=datetime.now(),
-        version=settings.app_version,
-        services={
-            "api": "operational",
-            "websocket": "operational",
-            "executor": "operational" if settings.enable_server_execution else "disabled"
-        }
+    return model_response(
+        HealthResponse(
+            status="healthy",
+            timestamp=datetime.now(),
+            version=settings.app_version,
+            services={
+                "api": "operational",
+                "websocket": "operational",
+                "executor": "operational" if settings.enable_server_execution else "disabled"
+            }
+        )
     )
@@ -4,9 +4,11 @@ Languages API Routes
 Endpoints for getting information about supported programming languages.
 """
 
-import json
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, status
+from typing import Dict, Tuple
+import msgspec
+import orjson
+from fastapi import APIRouter, HTTPException, Response, status
 
 from app.schemas.session import LanguageInfo, LanguageListResponse
 from app.models.domain import Language
@@ -30,23 +32,10 @@ def load_languages():
     languages_file = Path(__file__).parent.parent.parent / "data" / "languages.json"
     
     try:
-        with open(languages_file, "r") as f:
-            data = json.load(f)
-            
-        languages = []
-        for lang_data in data["languages"]:
-            language = Language(
-                id=lang_data["id"],
-                name=lang_data["name"],
-                version=lang_data["version"],
-                file_extension=lang_data["file_extension"],
-                monaco_language=lang_data["monaco_language"],
-                can_run_in_browser=lang_data["can_run_in_browser"],
-                default_code=lang_data["default_code"]
-            )
-            languages.append(language)
+        data = orjson.loads(languages_file.read_bytes())
         
-        return languages
+        # The file ships with the app and its keys match Language's fields
+        return [Language(**lang_data) for lang_data in data["languages"]]
         
     except Exception as e:
         # If file doesn't exist or is invalid, return default languages
@@ -82,16 +71,18 @@ def get_default_languages():
     ]
 
 
-# Cache loaded languages
-_languages_cache = None
+# Languages are static, so load them once at import
+_LANGUAGES: Tuple[Language, ...] = tuple(load_languages())
 
+# Index languages by id for O(1) template lookups
+_LANGUAGE_INDEX: Dict[str, Language] = {lang.id: lang for lang in _LANGUAGES}
 
-def get_languages():
-    """Get cached language list"""
-    global _languages_cache
-    if _languages_cache is None:
-        _languages_cache = load_languages()
-    return _languages_cache
+# list_languages body, serialized once since it never changes
+_LANGUAGE_LIST_JSON = orjson.dumps(
+    LanguageListResponse(
+        languages=[LanguageInfo(**msgspec.structs.asdict(lang)) for lang in _LANGUAGES]
+    ).model_dump(mode="json")
+)
 
 
 @router.get(
@@ -110,23 +101,7 @@ async def list_languages():
     Returns:
         List of supported languages with metadata
     """
-    languages = get_languages()
-    
-    # Convert to response format
-    language_infos = [
-        LanguageInfo(
-            id=lang.id,
-            name=lang.name,
-            version=lang.version,
-            file_extension=lang.file_extension,
-            monaco_language=lang.monaco_language,
-            can_run_in_browser=lang.can_run_in_browser,
-            default_code=lang.default_code
-        )
-        for lang in languages
-    ]
-    
-    return LanguageListResponse(languages=language_infos)
+    return Response(content=_LANGUAGE_LIST_JSON, media_type="application/json")
 
 
 @router.get(
@@ -149,18 +124,14 @@ async def get_language_template(language_id: str):
     Raises:
         404: If language is not supported
     """
-    languages = get_languages()
-    
-    # Find the language
-    for lang in languages:
-        if lang.id == language_id:
-            return {
-                "language_id": lang.id,
-                "template": lang.default_code
-            }
+    lang = _LANGUAGE_INDEX.get(language_id)
+    if lang is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Language '{language_id}' is not supported"
+        )
     
-    # Language not found
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail=f"Language '{language_id}' is not supported"
-    )
+    return {
+        "language_id": lang.id,
+        "template": lang.default_code
+    }
@@ -5,7 +5,8 @@ Endpoints for managing coding interview sessions.
 """
 
 from typing import Optional
-from fastapi import APIRouter, HTTPException, status, Query
+import orjson
+from fastapi import APIRouter, HTTPException, Response, status, Query
 
 from app.schemas.session import (
     CreateSessionRequest,
@@ -16,7 +17,7 @@ from app.schemas.session import (
     ExecutionSummary
 )
 from app.services.session_manager import session_manager
-from app.core.config import settings
+from app.api.responses import model_response
 
 
 # Create a router for session endpoints
@@ -56,17 +57,17 @@ async def create_session(
         max_participants=request.max_participants
     )
     
-    # Generate join URL
-    join_url = f"{settings.frontend_url}/session/{session.session_id}"
-    
-    # Return response
-    return SessionResponse(
-        session_id=session.session_id,
-        join_url=join_url,
-        created_at=session.created_at,
-        host_name=session.host_name,
-        status=session.status.value,
-        participant_count=session.participant_count
+    # Return response; built from the session we just created, so skip validation
+    return model_response(
+        SessionResponse.model_construct(
+            session_id=session.session_id,
+            join_url=session.join_url,
+            created_at=session.created_at,
+            host_name=session.host_name,
+            status=session.status.value,
+            participant_count=session.participant_count
+        ),
+        status_code=status.HTTP_201_CREATED
     )
 
 
@@ -115,27 +116,22 @@ async def list_sessions(
                 detail=f"Invalid status: {status}"
             )
     
-    # Apply limit
-    sessions = sessions[:limit]
-    
-    # Convert to response format
-    session_responses = []
-    for session in sessions:
-        join_url = f"{settings.frontend_url}/session/{session.session_id}"
-        session_responses.append(
-            SessionResponse(
-                session_id=session.session_id,
-                join_url=join_url,
-                created_at=session.created_at,
-                host_name=session.host_name,
-                status=session.status.value,
-                participant_count=session.participant_count
-            )
-        )
+    # Build plain dicts and encode them in one pass
+    payload = [
+        {
+            "session_id": session.session_id,
+            "join_url": session.join_url,
+            "created_at": session.created_at,
+            "host_name": session.host_name,
+            "status": session.status.value,
+            "participant_count": session.participant_count
+        }
+        for session in sessions[:limit]
+    ]
     
-    return SessionListResponse(
-        sessions=session_responses,
-        total=len(session_responses)
+    return Response(
+        content=orjson.dumps({"sessions": payload, "total": len(payload)}),
+        media_type="application/json"
     )
 
 
@@ -162,57 +158,55 @@ async def get_session(session_id: str):
         404: If session doesn't exist
     """
     # Get session from manager
-    try:
-        session = session_manager.get_session(session_id)
-    except Exception as e:
+    session = session_manager.get_session(session_id)
+    if session is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
+            detail=f"Session {session_id} does not exist"
         )
     
-    # Generate join URL
-    join_url = f"{settings.frontend_url}/session/{session.session_id}"
-    
-    # Convert participants
+    # Convert participants; domain objects are trusted, so skip validation
     participants = [
-        ParticipantInfo(
+        ParticipantInfo.model_construct(
             client_id=p.client_id,
             display_name=p.display_name,
             role=p.role.value,
             joined_at=p.joined_at,
             is_connected=p.is_connected
         )
-        for p in session.participants
+        for p in session.participants.values()
         if p.is_connected
     ]
     
-    # Convert execution history (last 10)
+    # Convert execution history (last 10); the records are already trusted
     execution_history = [
-        ExecutionSummary(
+        ExecutionSummary.model_construct(
             timestamp=e.timestamp,
             language=e.language,
             stdout=e.stdout[:500] if e.stdout else "",  # Truncate
             success=e.success,
             duration=e.duration_ms
         )
-        for e in session.execution_history[-10:]
+        for e in session.latest_executions(10)
     ]
     
     # Return detailed response
-    return SessionDetails(
-        session_id=session.session_id,
-        join_url=join_url,
-        created_at=session.created_at,
-        updated_at=session.updated_at,
-        host_name=session.host_name,
-        session_name=session.session_name,
-        status=session.status.value,
-        participant_count=session.participant_count,
-        max_participants=session.max_participants,
-        participants=participants,
-        current_code=session.current_code,
-        current_language=session.current_language,
-        execution_history=execution_history
+    return model_response(
+        SessionDetails.model_construct(
+            session_id=session.session_id,
+            join_url=session.join_url,
+            created_at=session.created_at,
+            updated_at=session.updated_at,
+            host_name=session.host_name,
+            session_name=session.session_name,
+            status=session.status.value,
+            participant_count=session.participant_count,
+            max_participants=session.max_participants,
+            participants=participants,
+            current_code=session.current_code,
+            current_language=session.current_language,
+            execution_history=execution_history
+        )
     )
 
 
@@ -235,14 +229,14 @@ async def end_session(session_id: str):
     Raises:
         404: If session doesn't exist
     """
-    try:
-        session_manager.end_session(session_id)
-    except Exception as e:
+    if session_manager.get_session(session_id) is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e)
+            detail=f"Session {session_id} does not exist"
         )
     
+    session_manager.end_session(session_id)
+    
     # In a real implementation, we would also:
     # 1. Verify the requester is the session host
     # 2. Disconnect all WebSocket connections
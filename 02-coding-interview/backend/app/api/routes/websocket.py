@@ -4,16 +4,27 @@ WebSocket API Route
 Real-time collaboration endpoint for coding sessions.
 """
 
-import json
+import asyncio
 import logging
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+import msgspec
+import orjson
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 
 from app.services.session_manager import session_manager
 from app.services.connection_manager import connection_manager
 from app.services.code_executor import code_executor
-from app.models.domain import ParticipantRole, ExecutionResult
-from app.schemas.websocket import parse_client_message
+from app.models.domain import ParticipantRole, ExecutionResult, Session
+from app.schemas.websocket import (
+    CLIENT_MESSAGE_DECODER,
+    JoinSessionMessage,
+    LeaveSessionMessage,
+    CodeUpdateMessage,
+    LanguageChangeMessage,
+    ExecuteCodeMessage
+)
 from app.core.config import settings
 
 
@@ -24,6 +35,209 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+async def _send(websocket: WebSocket, payload: dict) -> None:
+    """Send a message to one client, encoded with orjson"""
+    await websocket.send_text(orjson.dumps(payload).decode())
+
+
+def _error(code: str, message: str, timestamp: str) -> dict:
+    """Build an error message for a client, stamped with an ISO timestamp"""
+    return {
+        "type": "error",
+        "data": {"code": code, "message": message},
+        "timestamp": timestamp
+    }
+
+
+@dataclass(slots=True)
+class _Context:
+    """Per-connection state shared by the message handlers"""
+    websocket: WebSocket
+    session_id: str
+    session: Session
+    client_id: Optional[str] = None
+    # In-flight code_update broadcasts (kept referenced until they finish)
+    broadcast_tasks: Set[asyncio.Task] = field(default_factory=set)
+    # Timestamp of the message being handled, shared by every reply and broadcast
+    now: Optional[datetime] = None
+    now_iso: str = ""
+
+
+async def _handle_join_session(ctx: _Context, message: JoinSessionMessage) -> None:
+    """User is joining the session"""
+    ctx.client_id = message.client_id
+    
+    # Add participant to session
+    try:
+        participant = session_manager.add_participant(
+            session_id=ctx.session_id,
+            client_id=ctx.client_id,
+            display_name=message.display_name,
+            role=ParticipantRole.PARTICIPANT
+        )
+        
+        participants = ctx.session.connected_participants_json()
+        
+        # Send current session state to new user
+        await _send(ctx.websocket, {
+            "type": "session_state",
+            "data": {
+                "session_id": ctx.session_id,
+                "code": ctx.session.current_code,
+                "language": ctx.session.current_language,
+                "participant_count": ctx.session.participant_count,
+                "participants": participants
+            },
+            "timestamp": ctx.now_iso
+        })
+        
+        # Broadcast user joined to others
+        await connection_manager.broadcast_to_session(
+            session_id=ctx.session_id,
+            message={
+                "type": "user_joined",
+                "data": {
+                    "session_id": ctx.session_id,
+                    "client_id": ctx.client_id,
+                    "display_name": message.display_name,
+                    "participant_count": ctx.session.participant_count,
+                    "participants": participants
+                },
+                "timestamp": ctx.now_iso
+            },
+            exclude=ctx.websocket
+        )
+    
+    except Exception as e:
+        await _send(ctx.websocket, _error("JOIN_FAILED", str(e), ctx.now_iso))
+
+
+async def _handle_code_update(ctx: _Context, message: CodeUpdateMessage) -> None:
+    """User is updating code"""
+    sender = ctx.session.get_participant(message.client_id)
+    
+    ctx.session.update_code(message.code, message.language, ctx.now)
+    
+    # Queue the broadcast; bursts of keystrokes go out as one update
+    task = connection_manager.queue_code_update(
+        session_id=ctx.session_id,
+        message={
+            "type": "code_update",
+            "data": {
+                "session_id": ctx.session_id,
+                "client_id": message.client_id,
+                "display_name": sender.display_name if sender else "Unknown",
+                "code": message.code,
+                "language": message.language,
+                "cursor_position": message.cursor_position
+            },
+            "timestamp": ctx.now_iso
+        },
+        exclude=ctx.websocket
+    )
+    if task not in ctx.broadcast_tasks:
+        ctx.broadcast_tasks.add(task)
+        task.add_done_callback(ctx.broadcast_tasks.discard)
+
+
+async def _handle_language_change(ctx: _Context, message: LanguageChangeMessage) -> None:
+    """User is changing language"""
+    sender = ctx.session.get_participant(message.client_id)
+    
+    ctx.session.current_language = message.language
+    ctx.session.updated_at = ctx.now
+    
+    # A queued code update carries the old language, so send it first
+    await connection_manager.flush_code_update(ctx.session_id)
+    
+    # Broadcast to other users
+    await connection_manager.broadcast_to_session(
+        session_id=ctx.session_id,
+        message={
+            "type": "language_change",
+            "data": {
+                "session_id": ctx.session_id,
+                "client_id": message.client_id,
+                "display_name": sender.display_name if sender else "Unknown",
+                "language": message.language
+            },
+            "timestamp": ctx.now_iso
+        },
+        exclude=ctx.websocket
+    )
+
+
+async def _handle_execute_code(ctx: _Context, message: ExecuteCodeMessage) -> None:
+    """User wants to execute code"""
+    # Check rate limit
+    if not ctx.session.try_record_execution():
+        await _send(ctx.websocket, _error(
+            "RATE_LIMIT_EXCEEDED",
+            settings.rate_limit_error_message,
+            ctx.now_iso
+        ))
+        return
+    
+    # Execute code in a worker thread so other connections keep flowing
+    try:
+        stdout, stderr, exit_code, duration_ms, error = await asyncio.to_thread(
+            code_executor.execute,
+            code=message.code,
+            language=message.language,
+            stdin="",
+            time_limit_ms=settings.code_execution_timeout * 1000
+        )
+        
+        # Create execution result
+        result = ExecutionResult(
+            session_id=ctx.session_id,
+            language=message.language,
+            stdout=stdout,
+            stderr=stderr,
+            exit_code=exit_code,
+            duration_ms=duration_ms,
+            success=(exit_code == 0 and error is None),
+            error=error,
+            executed_by=message.client_id
+        )
+        
+        # Add to session history
+        session_manager.add_execution_result(ctx.session_id, result)
+        
+        # Broadcast result to all users
+        await connection_manager.broadcast_to_all(
+            session_id=ctx.session_id,
+            message={
+                "type": "execution_result",
+                "data": {
+                    "session_id": ctx.session_id,
+                    "client_id": message.client_id,
+                    "result": {
+                        "stdout": stdout,
+                        "stderr": stderr,
+                        "exit_code": exit_code,
+                        "duration": duration_ms,
+                        "success": result.success,
+                        "error": error
+                    }
+                },
+                "timestamp": ctx.now_iso
+            }
+        )
+    
+    except Exception as e:
+        await _send(ctx.websocket, _error("EXECUTION_FAILED", str(e), ctx.now_iso))
+
+
+# Message class -> handler, looked up once per message
+_HANDLERS: Dict[type, Callable[[_Context, Any], Awaitable[None]]] = {
+    JoinSessionMessage: _handle_join_session,
+    CodeUpdateMessage: _handle_code_update,
+    LanguageChangeMessage: _handle_language_change,
+    ExecuteCodeMessage: _handle_execute_code,
+}
+
+
 @router.websocket("/ws/sessions/{session_id}")
 async def websocket_endpoint(websocket: WebSocket, session_id: str):
     """
@@ -48,301 +262,97 @@ async def websocket_endpoint(websocket: WebSocket, session_id: str):
         websocket: WebSocket connection
         session_id: Session to join
     """
-    client_id = None
+    ctx = None
     
     try:
         # Check if session exists
-        try:
-            session = session_manager.get_session(session_id)
-        except:
+        session = session_manager.get_session(session_id)
+        if session is None:
             await websocket.accept()
-            await websocket.send_json({
-                "type": "error",
-                "data": {
-                    "code": "SESSION_NOT_FOUND",
-                    "message": f"Session {session_id} does not exist"
-                },
-                "timestamp": datetime.now().isoformat()
-            })
+            await _send(websocket, _error(
+                "SESSION_NOT_FOUND",
+                f"Session {session_id} does not exist",
+                datetime.now().isoformat()
+            ))
             await websocket.close()
             return
         
         # Accept connection
-        connection_id = await connection_manager.connect(websocket, session_id, "unknown")
+        await connection_manager.connect(websocket, session_id, "unknown")
+        ctx = _Context(
+            websocket=websocket,
+            session_id=session_id,
+            session=session
+        )
         
-        logger.info(f"WebSocket connected for session {session_id}")
+        logger.info("WebSocket connected for session %s", session_id)
         
         # Main message loop
         while True:
             # Receive message from client
-            try:
-                data = await websocket.receive_json()
-            except json.JSONDecodeError:
-                await websocket.send_json({
-                    "type": "error",
-                    "data": {
-                        "code": "INVALID_JSON",
-                        "message": "Invalid JSON format"
-                    },
-                    "timestamp": datetime.now().isoformat()
-                })
-                continue
+            raw = await websocket.receive_text()
+            
+            # One timestamp per received message, shared by every reply and broadcast
+            ctx.now = datetime.now()
+            ctx.now_iso = now_iso = ctx.now.isoformat()
             
-            # Parse message
+            # Decode and validate in one pass
             try:
-                message = parse_client_message(data)
-            except Exception as e:
-                await websocket.send_json({
-                    "type": "error",
-                    "data": {
-                        "code": "INVALID_MESSAGE",
-                        "message": str(e)
-                    },
-                    "timestamp": datetime.now().isoformat()
-                })
+                message = CLIENT_MESSAGE_DECODER.decode(raw)
+            except msgspec.ValidationError as e:
+                await _send(websocket, _error("INVALID_MESSAGE", str(e), now_iso))
+                continue
+            except msgspec.DecodeError:
+                await _send(websocket, _error("INVALID_JSON", "Invalid JSON format", now_iso))
                 continue
             
             # Handle different message types
-            message_type = message.type
-            
-            if message_type == "join_session":
-                # User is joining the session
-                client_id = message.client_id
-                
-                # Add participant to session
-                try:
-                    participant = session_manager.add_participant(
-                        session_id=session_id,
-                        client_id=client_id,
-                        display_name=message.display_name,
-                        role=ParticipantRole.PARTICIPANT,
-                        connection_id=connection_id
-                    )
-                    
-                    # Send current session state to new user
-                    await websocket.send_json({
-                        "type": "session_state",
-                        "data": {
-                            "session_id": session_id,
-                            "code": session.current_code,
-                            "language": session.current_language,
-                            "participant_count": session.participant_count,
-                            "participants": [
-                                {
-                                    "client_id": p.client_id,
-                                    "display_name": p.display_name,
-                                    "role": p.role.value
-                                }
-                                for p in session.participants
-                                if p.is_connected
-                            ]
-                        },
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    
-                    # Broadcast user joined to others
-                    await connection_manager.broadcast_to_session(
-                        session_id=session_id,
-                        message={
-                            "type": "user_joined",
-                            "data": {
-                                "session_id": session_id,
-                                "client_id": client_id,
-                                "display_name": message.display_name,
-                                "participant_count": session.participant_count,
-                                "participants": [
-                                    {
-                                        "client_id": p.client_id,
-                                        "display_name": p.display_name,
-                                        "role": p.role.value
-                                    }
-                                    for p in session.participants
-                                    if p.is_connected
-                                ]
-                            },
-                            "timestamp": datetime.now().isoformat()
-                        },
-                        exclude=websocket
-                    )
-                    
-                except Exception as e:
-                    await websocket.send_json({
-                        "type": "error",
-                        "data": {
-                            "code": "JOIN_FAILED",
-                            "message": str(e)
-                        },
-                        "timestamp": datetime.now().isoformat()
-                    })
-            
-            elif message_type == "code_update":
-                # User is updating code
-                session_manager.update_session_code(
-                    session_id=session_id,
-                    code=message.code,
-                    language=message.language
-                )
-                
-                # Broadcast to other users
-                await connection_manager.broadcast_to_session(
-                    session_id=session_id,
-                    message={
-                        "type": "code_update",
-                        "data": {
-                            "session_id": session_id,
-                            "client_id": message.client_id,
-                            "display_name": session.get_participant(message.client_id).display_name
-                                if session.get_participant(message.client_id) else "Unknown",
-                            "code": message.code,
-                            "language": message.language,
-                            "cursor_position": message.cursor_position
-                        },
-                        "timestamp": datetime.now().isoformat()
-                    },
-                    exclude=websocket
-                )
-            
-            elif message_type == "language_change":
-                # User is changing language
-                session.current_language = message.language
-                session.updated_at = datetime.now()
-                
-                # Broadcast to other users
-                await connection_manager.broadcast_to_session(
-                    session_id=session_id,
-                    message={
-                        "type": "language_change",
-                        "data": {
-                            "session_id": session_id,
-                            "client_id": message.client_id,
-                            "display_name": session.get_participant(message.client_id).display_name
-                                if session.get_participant(message.client_id) else "Unknown",
-                            "language": message.language
-                        },
-                        "timestamp": datetime.now().isoformat()
-                    },
-                    exclude=websocket
-                )
-            
-            elif message_type == "execute_code":
-                # User wants to execute code
-                # Check rate limit
-                if not session_manager.check_rate_limit(session_id):
-                    await websocket.send_json({
-                        "type": "error",
-                        "data": {
-                            "code": "RATE_LIMIT_EXCEEDED",
-                            "message": f"Rate limit exceeded: {settings.rate_limit_executions_per_minute} executions per minute"
-                        },
-                        "timestamp": datetime.now().isoformat()
-                    })
-                    continue
-                
-                # Execute code
-                try:
-                    stdout, stderr, exit_code, duration_ms, error = code_executor.execute(
-                        code=message.code,
-                        language=message.language,
-                        stdin="",
-                        time_limit_ms=settings.code_execution_timeout * 1000
-                    )
-                    
-                    # Create execution result
-                    result = ExecutionResult(
-                        session_id=session_id,
-                        language=message.language,
-                        stdout=stdout,
-                        stderr=stderr,
-                        exit_code=exit_code,
-                        duration_ms=duration_ms,
-                        success=(exit_code == 0 and error is None),
-                        error=error,
-                        executed_by=message.client_id
-                    )
-                    
-                    # Add to session history
-                    session_manager.add_execution_result(session_id, result)
-                    
-                    # Broadcast result to all users
-                    await connection_manager.broadcast_to_all(
-                        session_id=session_id,
-                        message={
-                            "type": "execution_result",
-                            "data": {
-                                "session_id": session_id,
-                                "client_id": message.client_id,
-                                "result": {
-                                    "stdout": stdout,
-                                    "stderr": stderr,
-                                    "exit_code": exit_code,
-                                    "duration": duration_ms,
-                                    "success": result.success,
-                                    "error": error
-                                }
-                            },
-                            "timestamp": datetime.now().isoformat()
-                        }
-                    )
-                    
-                except Exception as e:
-                    await websocket.send_json({
-                        "type": "error",
-                        "data": {
-                            "code": "EXECUTION_FAILED",
-                            "message": str(e)
-                        },
-                        "timestamp": datetime.now().isoformat()
-                    })
-            
-            elif message_type == "leave_session":
-                # User is leaving
+            if type(message) is LeaveSessionMessage:
                 break
+            
+            handler = _HANDLERS.get(type(message))
+            if handler is not None:
+                await handler(ctx, message)
     
     except WebSocketDisconnect:
         # Client disconnected
-        logger.info(f"WebSocket disconnected for session {session_id}")
+        logger.info("WebSocket disconnected for session %s", session_id)
     
     except Exception as e:
         # Unexpected error
-        logger.error(f"WebSocket error for session {session_id}: {e}")
+        logger.error("WebSocket error for session %s: %s", session_id, e)
         try:
-            await websocket.send_json({
-                "type": "error",
-                "data": {
-                    "code": "INTERNAL_ERROR",
-                    "message": "An unexpected error occurred"
-                },
-                "timestamp": datetime.now().isoformat()
-            })
+            await _send(websocket, _error("INTERNAL_ERROR", "An unexpected error occurred", datetime.now().isoformat()))
         except:
             pass
     
     finally:
+        # Let pending code updates reach peers before announcing the leave
+        if ctx is not None and ctx.broadcast_tasks:
+            await asyncio.gather(*ctx.broadcast_tasks, return_exceptions=True)
+        
         # Clean up connection
         session_id_disconnected, client_id_disconnected = connection_manager.disconnect(websocket)
         
-        if session_id_disconnected and client_id_disconnected:
+        # Session might have been deleted while we were connected
+        session = session_manager.get_session(session_id_disconnected) if session_id_disconnected else None
+        
+        if session is not None and client_id_disconnected:
             # Remove participant from session
             session_manager.remove_participant(session_id_disconnected, client_id_disconnected)
             
-            # Get updated session
-            try:
-                session = session_manager.get_session(session_id_disconnected)
-                
-                # Broadcast user left to remaining users
-                await connection_manager.broadcast_to_session(
-                    session_id=session_id_disconnected,
-                    message={
-                        "type": "user_left",
-                        "data": {
-                            "session_id": session_id_disconnected,
-                            "client_id": client_id_disconnected,
-                            "display_name": "User",
-                            "participant_count": session.participant_count
-                        },
-                        "timestamp": datetime.now().isoformat()
+            # Broadcast user left to remaining users
+            await connection_manager.broadcast_to_session(
+                session_id=session_id_disconnected,
+                message={
+                    "type": "user_left",
+                    "data": {
+                        "session_id": session_id_disconnected,
+                        "client_id": client_id_disconnected,
+                        "display_name": "User",
+                        "participant_count": session.participant_count
                     },
-                    exclude=None
-                )
-            except:
-                pass  # Session might have been deleted
+                    "timestamp": datetime.now().isoformat()
+                },
+                exclude=None
+            )
@@ -5,7 +5,8 @@ This module handles all configuration settings for the application.
 It uses Pydantic Settings to validate and manage environment variables.
 """
 
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional, Tuple
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -45,6 +46,7 @@ class Settings(BaseSettings):
     # WebSocket Configuration
     ws_heartbeat_interval: int = 30  # Seconds between heartbeat pings
     ws_message_size_limit: int = 65536  # Max message size in bytes (64KB)
+    ws_code_update_coalesce_ms: int = 30  # Window in which code updates collapse into one broadcast
     
     # Code Execution Configuration
     code_execution_timeout: int = 5  # Seconds before killing execution
@@ -71,18 +73,64 @@ class Settings(BaseSettings):
         # For example: export MAX_PARTICIPANTS_PER_SESSION=20
 
 
+@dataclass(frozen=True, slots=True)
+class FrozenSettings:
+    """
+    Immutable snapshot of Settings used at runtime.
+    
+    Settings does the environment parsing and validation once; after that,
+    hot paths read plain slot attributes instead of going through pydantic.
+    """
+    
+    app_name: str
+    app_version: str
+    debug: bool
+    host: str
+    port: int
+    reload: bool
+    cors_origins: Tuple[str, ...]
+    session_id_length: int
+    max_session_age_hours: int
+    max_participants_per_session: int
+    ws_heartbeat_interval: int
+    ws_message_size_limit: int
+    ws_code_update_coalesce_ms: int
+    code_execution_timeout: int
+    code_max_output_size: int
+    enable_server_execution: bool
+    max_code_size: int
+    rate_limit_executions_per_minute: int
+    frontend_url: str
+    log_level: str
+    log_format: str
+    
+    # Derived values, computed once
+    rate_limit_error_message: str
+    cors_origins_set: FrozenSet[str]  # O(1) origin checks in CORS middleware
+
+
 @lru_cache()
-def get_settings() -> Settings:
+def get_settings() -> FrozenSettings:
     """
     Get cached application settings.
     
-    This function uses @lru_cache to ensure we only create one
-    Settings instance and reuse it throughout the application.
+    This function uses @lru_cache to ensure we only load and
+    validate Settings once and reuse the frozen copy throughout
+    the application.
     
     Returns:
-        Settings: Application configuration
+        FrozenSettings: Application configuration
     """
-    return Settings()
+    raw = Settings()
+    values = raw.model_dump()
+    values["cors_origins"] = tuple(raw.cors_origins)
+    return FrozenSettings(
+        **values,
+        rate_limit_error_message=(
+            f"Rate limit exceeded: {raw.rate_limit_executions_per_minute} executions per minute"
+        ),
+        cors_origins_set=frozenset(raw.cors_origins)
+    )
 
 
 # Create a global settings instance for easy import
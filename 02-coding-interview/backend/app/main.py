@@ -5,18 +5,20 @@ This is the entry point for the FastAPI backend server.
 It sets up the application, middleware, routes, and error handlers.
 """
 
+import hashlib
 import logging
+import mimetypes
 import os
 from datetime import datetime
 from pathlib import Path
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import ORJSONResponse, FileResponse, Response
 from fastapi.exceptions import RequestValidationError
-from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
 from app.core.exceptions import BaseAPIException
+from app.services.code_executor import code_executor
 
 # Import routers
 from app.api.routes import health, sessions, languages, execution, websocket
@@ -59,7 +61,8 @@ Connect to `/ws/sessions/{session_id}` for real-time collaboration.
     version=settings.app_version,
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    default_response_class=ORJSONResponse  # orjson is much faster than stdlib json
 )
 
 
@@ -67,7 +70,7 @@ Connect to `/ws/sessions/{session_id}` for real-time collaboration.
 # This allows the frontend to communicate with the backend
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.cors_origins,  # Which URLs can access this API
+    allow_origins=settings.cors_origins_set,  # Which URLs can access this API
     allow_credentials=True,  # Allow cookies/auth headers
     allow_methods=["*"],  # Allow all HTTP methods (GET, POST, etc.)
     allow_headers=["*"],  # Allow all headers
@@ -82,13 +85,13 @@ async def handle_api_exception(request: Request, exc: BaseAPIException):
     
     Converts our custom exceptions to proper HTTP responses.
     """
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.error_code,
             "message": exc.message,
             "details": exc.details,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         }
     )
 
@@ -108,13 +111,13 @@ async def handle_validation_error(request: Request, exc: RequestValidationError)
             "type": error["type"]
         })
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "error": "VALIDATION_ERROR",
             "message": "Invalid request data",
             "details": {"errors": errors},
-            "timestamp": datetime.now().isoformat()
+            "timestamp": datetime.now()
         }
     )
 
@@ -133,11 +136,47 @@ app.include_router(websocket.router)  # WebSocket for real-time
 serve_frontend = os.getenv("SERVE_FRONTEND", "false").lower() == "true"
 frontend_build_path = os.getenv("FRONTEND_BUILD_PATH", "/app/frontend-dist")
 
-if serve_frontend and os.path.exists(frontend_build_path):
-    logger.info(f"Serving frontend static files from {frontend_build_path}")
+
+def mount_frontend(app: FastAPI, build_path: str) -> None:
+    """
+    Add routes serving the built React frontend.
+    
+    Build assets are served from memory with ETags; every other
+    non-API path returns index.html for client-side routing.
+    
+    Args:
+        app: Application to add the routes to
+        build_path: Directory holding the frontend build
+    """
+    # Load the hashed build assets into memory once; they never change
+    # while the container runs, so they are served without touching disk
+    assets_dir = Path(build_path) / "assets"
+    frontend_assets = {}
+    for asset_file in assets_dir.rglob("*"):
+        if asset_file.is_file():
+            body = asset_file.read_bytes()
+            media_type = mimetypes.guess_type(asset_file.name)[0] or "application/octet-stream"
+            etag = f'"{hashlib.md5(body).hexdigest()}"'
+            frontend_assets[asset_file.relative_to(assets_dir).as_posix()] = (body, media_type, etag)
     
-    # Mount static files for assets
-    app.mount("/assets", StaticFiles(directory=f"{frontend_build_path}/assets"), name="assets")
+    @app.api_route("/assets/{path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def serve_frontend_asset(path: str, request: Request):
+        """Serve a frontend build asset from the in-memory cache."""
+        asset = frontend_assets.get(path)
+        if asset is None:
+            return Response(status_code=status.HTTP_404_NOT_FOUND)
+        body, media_type, etag = asset
+        headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(content=body, media_type=media_type, headers=headers)
+    
+    # Paths owned by the API rather than the React app
+    non_frontend_prefixes = ("api/", "ws/", "docs", "redoc", "openapi")
+    
+    # The build directory is baked into the image, so check for index.html once
+    index_path = Path(build_path) / "index.html"
+    index_exists = index_path.exists()
     
     # Serve index.html for the root and all non-API routes (for React Router)
     @app.get("/{path:path}")
@@ -147,16 +186,20 @@ if serve_frontend and os.path.exists(frontend_build_path):
         Returns index.html for all non-API routes to support client-side routing.
         """
         # Skip API routes and WebSocket
-        if path.startswith("api/") or path.startswith("ws/") or path.startswith("docs") or path.startswith("redoc") or path.startswith("openapi"):
+        if path.startswith(non_frontend_prefixes):
             return {"error": "Not found"}
         
-        index_path = Path(frontend_build_path) / "index.html"
-        if index_path.exists():
+        if index_exists:
             return FileResponse(index_path)
         else:
             return {"error": "Frontend not found"}
 
 
+if serve_frontend and os.path.exists(frontend_build_path):
+    logger.info(f"Serving frontend static files from {frontend_build_path}")
+    mount_frontend(app, frontend_build_path)
+
+
 # Root endpoint
 @app.get("/", tags=["Root"])
 async def root():
@@ -181,7 +224,7 @@ async def root():
             "languages": "/api/v1/languages",
             "websocket": "/ws/sessions/{session_id}"
         },
-        "timestamp": datetime.now().isoformat()
+        "timestamp": datetime.now()
     }
 
 
@@ -215,6 +258,9 @@ async def shutdown_event():
     """
     logger.info("Shutting down application")
     
+    # Remove compiled programs cached on disk
+    code_executor.clear_compile_cache()
+    
     # In production, you would:
     # - Close database connections
     # - Stop background tasks
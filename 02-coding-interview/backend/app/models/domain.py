@@ -5,11 +5,25 @@ These are the core data structures used throughout the application.
 They represent the business entities like Sessions, Participants, etc.
 """
 
+import time
+from collections import deque
+from itertools import islice
 from datetime import datetime
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Any
 from enum import Enum
 
+import msgspec
+import orjson
+
+from app.core.config import settings
+
+
+# Window for the per-session execution rate limit
+RATE_LIMIT_WINDOW_SECONDS = 60.0
+
+# Executions kept per session to prevent memory issues
+MAX_EXECUTION_HISTORY = 50
+
 
 class SessionStatus(str, Enum):
     """Status of a coding session"""
@@ -25,8 +39,7 @@ class ParticipantRole(str, Enum):
     VIEWER = "viewer"
 
 
-@dataclass
-class Participant:
+class Participant(msgspec.Struct, kw_only=True, gc=False):
     """
     Represents a user in a coding session.
     
@@ -38,24 +51,16 @@ class Participant:
     joined_at: datetime
     connection_id: Optional[str] = None  # WebSocket connection ID
     is_connected: bool = True
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            "client_id": self.client_id,
-            "display_name": self.display_name,
-            "role": self.role.value,
-            "joined_at": self.joined_at.isoformat(),
-            "is_connected": self.is_connected
-        }
 
 
-@dataclass
-class ExecutionResult:
+class ExecutionResult(msgspec.Struct, kw_only=True, gc=False):
     """
     Result of code execution.
     
     Contains output, errors, and metadata about the execution.
+    Stored per run in each session's history, so kept as a compact Struct.
+    Holds only scalar fields, so it can never be part of a reference cycle
+    and is left untracked by the garbage collector.
     """
     session_id: str
     language: str
@@ -65,32 +70,20 @@ class ExecutionResult:
     duration_ms: int
     success: bool
     error: Optional[str] = None
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp: datetime = msgspec.field(default_factory=datetime.now)
     executed_by: Optional[str] = None  # client_id of executor
-    
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            "session_id": self.session_id,
-            "language": self.language,
-            "stdout": self.stdout,
-            "stderr": self.stderr,
-            "exit_code": self.exit_code,
-            "duration": self.duration_ms,
-            "success": self.success,
-            "error": self.error,
-            "timestamp": self.timestamp.isoformat(),
-            "executed_by": self.executed_by
-        }
 
 
-@dataclass
-class Session:
+class Session(msgspec.Struct, kw_only=True, dict=True):
     """
     Represents a coding interview session.
     
     This is the main entity that holds all information about a coding session,
     including participants, code, and execution history.
+    
+    Derived caches are kept as plain instance attributes (dict=True), not as
+    Struct fields, so they never appear in the constructor, repr, equality
+    or encoding. __post_init__ sets them up.
     """
     session_id: str
     created_at: datetime
@@ -99,15 +92,28 @@ class Session:
     status: SessionStatus = SessionStatus.ACTIVE
     current_code: str = ""
     current_language: str = "javascript"
-    participants: List[Participant] = field(default_factory=list)
-    execution_history: List[ExecutionResult] = field(default_factory=list)
-    updated_at: datetime = field(default_factory=datetime.now)
+    participants: Dict[str, Participant] = msgspec.field(default_factory=dict)  # Keyed by client_id
+    execution_history: Deque[ExecutionResult] = msgspec.field(
+        default_factory=lambda: deque(maxlen=MAX_EXECUTION_HISTORY)
+    )
+    updated_at: datetime = msgspec.field(default_factory=datetime.now)
     max_participants: int = 10
+    join_url: str = ""  # Shareable URL, set once at creation
+    # Monotonic times of the most recent executions; maxlen is the rate limit
+    recent_executions: Deque[float] = msgspec.field(
+        default_factory=lambda: deque(maxlen=settings.rate_limit_executions_per_minute)
+    )
+    
+    def __post_init__(self) -> None:
+        # Encoded presence list, rebuilt only after participants change
+        self._participants_json: Optional[orjson.Fragment] = None
+        # Number of connected participants, kept in step with participants
+        self._connected_count: int = sum(p.is_connected for p in self.participants.values())
     
     @property
     def participant_count(self) -> int:
         """Get count of connected participants"""
-        return len([p for p in self.participants if p.is_connected])
+        return self._connected_count
     
     @property
     def is_full(self) -> bool:
@@ -116,63 +122,90 @@ class Session:
     
     def add_participant(self, participant: Participant) -> None:
         """Add a participant to the session"""
-        # Remove existing participant with same client_id if any
-        self.participants = [
-            p for p in self.participants 
-            if p.client_id != participant.client_id
-        ]
-        self.participants.append(participant)
+        # Replace existing participant with same client_id if any
+        previous = self.participants.pop(participant.client_id, None)
+        if previous is not None and previous.is_connected:
+            self._connected_count -= 1
+        self.participants[participant.client_id] = participant
+        if participant.is_connected:
+            self._connected_count += 1
+        self._participants_json = None
         self.updated_at = datetime.now()
     
     def remove_participant(self, client_id: str) -> None:
         """Remove a participant from the session"""
-        for participant in self.participants:
-            if participant.client_id == client_id:
-                participant.is_connected = False
-                break
+        participant = self.participants.get(client_id)
+        if participant is not None and participant.is_connected:
+            participant.is_connected = False
+            self._connected_count -= 1
+        self._participants_json = None
         self.updated_at = datetime.now()
     
+    def connected_participants_json(self) -> orjson.Fragment:
+        """
+        Get the connected participants in the shape sent over WebSocket.
+        
+        The list is encoded once per roster change and returned as an
+        orjson Fragment, so every message embedding it reuses the bytes.
+        """
+        if self._participants_json is None:
+            self._participants_json = orjson.Fragment(orjson.dumps([
+                {
+                    "client_id": p.client_id,
+                    "display_name": p.display_name,
+                    "role": p.role.value
+                }
+                for p in self.participants.values()
+                if p.is_connected
+            ]))
+        return self._participants_json
+    
     def get_participant(self, client_id: str) -> Optional[Participant]:
         """Get a participant by client_id"""
-        for participant in self.participants:
-            if participant.client_id == client_id:
-                return participant
-        return None
+        return self.participants.get(client_id)
     
-    def update_code(self, code: str, language: str) -> None:
-        """Update the current code and language"""
+    def update_code(self, code: str, language: str, now: Optional[datetime] = None) -> None:
+        """
+        Update the current code and language.
+        
+        Args:
+            code: New code content
+            language: Programming language
+            now: Time of the update, if the caller already has it
+        """
         self.current_code = code
         self.current_language = language
-        self.updated_at = datetime.now()
+        self.updated_at = now or datetime.now()
     
     def add_execution_result(self, result: ExecutionResult) -> None:
         """Add an execution result to history"""
+        # The bounded deque drops the oldest result once full
         self.execution_history.append(result)
-        # Keep only last 50 executions to prevent memory issues
-        if len(self.execution_history) > 50:
-            self.execution_history = self.execution_history[-50:]
         self.updated_at = datetime.now()
     
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for JSON serialization"""
-        return {
-            "session_id": self.session_id,
-            "created_at": self.created_at.isoformat(),
-            "updated_at": self.updated_at.isoformat(),
-            "host_name": self.host_name,
-            "session_name": self.session_name,
-            "status": self.status.value,
-            "current_code": self.current_code,
-            "current_language": self.current_language,
-            "participant_count": self.participant_count,
-            "max_participants": self.max_participants,
-            "participants": [p.to_dict() for p in self.participants if p.is_connected],
-            "execution_history": [e.to_dict() for e in self.execution_history[-10:]]  # Last 10
-        }
+    def latest_executions(self, count: int = 10) -> List[ExecutionResult]:
+        """Get the most recent execution results, oldest first"""
+        history = self.execution_history
+        return list(islice(history, max(len(history) - count, 0), None))
+    
+    def try_record_execution(self) -> bool:
+        """
+        Record an execution if the session is under its rate limit.
+        
+        Returns:
+            True if the execution is allowed, False if the limit was hit
+        """
+        recent = self.recent_executions
+        now = time.monotonic()
+        if len(recent) == recent.maxlen and (
+            not recent or now - recent[0] < RATE_LIMIT_WINDOW_SECONDS
+        ):
+            return False
+        recent.append(now)
+        return True
 
 
-@dataclass
-class Language:
+class Language(msgspec.Struct, kw_only=True, gc=False):
     """
     Represents a supported programming language.
     
@@ -5,8 +5,29 @@ Pydantic models for code execution requests and responses.
 """
 
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, Optional
+
+from pydantic import (
+    BaseModel, ConfigDict, Field, GetPydanticSchema, WithJsonSchema, field_validator
+)
+from pydantic_core import core_schema
+
+from app.services.code_executor import CodeExecutor
+
+
+# Languages the executor can actually run
+SUPPORTED_LANGUAGES = tuple(CodeExecutor.LANGUAGE_CONFIG)
+
+# Lowercased, then checked against the supported ids, both inside pydantic-core.
+# A plain Literal would skip to_lower, and a pattern is checked before it.
+SupportedLanguage = Annotated[
+    str,
+    GetPydanticSchema(lambda _source, _handler: core_schema.chain_schema([
+        core_schema.str_schema(to_lower=True),
+        core_schema.literal_schema(list(SUPPORTED_LANGUAGES)),
+    ])),
+    WithJsonSchema({"type": "string", "enum": list(SUPPORTED_LANGUAGES)}),
+]
 
 
 class ExecuteCodeRequest(BaseModel):
@@ -20,7 +41,7 @@ class ExecuteCodeRequest(BaseModel):
         max_length=50000, 
         description="Source code to execute"
     )
-    language: str = Field(
+    language: SupportedLanguage = Field(
         ..., 
         description="Programming language"
     )
@@ -36,12 +57,6 @@ class ExecuteCodeRequest(BaseModel):
         description="Maximum execution time in milliseconds"
     )
     
-    @field_validator('language')
-    @classmethod
-    def validate_language(cls, v: str) -> str:
-        """Ensure language is lowercase"""
-        return v.lower()
-    
     @field_validator('code')
     @classmethod
     def validate_code_not_empty(cls, v: str) -> str:
@@ -50,9 +65,8 @@ class ExecuteCodeRequest(BaseModel):
             raise ValueError("Code cannot be empty")
         return v
     
-    class Config:
-        """Pydantic configuration"""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "code": "print('Hello, World!')\nfor i in range(5):\n    print(i)",
                 "language": "python",
@@ -60,6 +74,7 @@ class ExecuteCodeRequest(BaseModel):
                 "time_limit": 5000
             }
         }
+    )
 
 
 class ExecutionResponse(BaseModel):
@@ -78,9 +93,8 @@ class ExecutionResponse(BaseModel):
     error: Optional[str] = Field(None, description="Error message if execution failed")
     timestamp: datetime = Field(..., description="When the execution completed")
     
-    class Config:
-        """Pydantic configuration"""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "session_id": "abc123xyz789",
                 "language": "python",
@@ -93,3 +107,4 @@ class ExecutionResponse(BaseModel):
                 "timestamp": "2024-01-15T10:45:00Z"
             }
         }
+    )
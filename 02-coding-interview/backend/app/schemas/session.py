@@ -6,8 +6,8 @@ These ensure that data coming in and going out of our API is properly structured
 """
 
 from datetime import datetime
-from typing import List, Optional
-from pydantic import BaseModel, Field, field_validator
+from typing import Annotated, List, Optional
+from pydantic import BaseModel, ConfigDict, Field, StringConstraints
 
 
 class CreateSessionRequest(BaseModel):
@@ -26,7 +26,7 @@ class CreateSessionRequest(BaseModel):
         max_length=100, 
         description="Optional name for the session"
     )
-    initial_language: str = Field(
+    initial_language: Annotated[str, StringConstraints(to_lower=True)] = Field(
         "javascript", 
         description="Starting programming language"
     )
@@ -37,15 +37,8 @@ class CreateSessionRequest(BaseModel):
         description="Maximum number of participants"
     )
     
-    @field_validator('initial_language')
-    @classmethod
-    def validate_language(cls, v: str) -> str:
-        """Ensure language is lowercase"""
-        return v.lower()
-    
-    class Config:
-        """Pydantic configuration"""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "host_name": "John Interviewer",
                 "session_name": "Frontend Developer Interview",
@@ -53,6 +46,7 @@ class CreateSessionRequest(BaseModel):
                 "max_participants": 5
             }
         }
+    )
 
 
 class SessionResponse(BaseModel):
@@ -68,9 +62,8 @@ class SessionResponse(BaseModel):
     status: str = Field(..., description="Current session status")
     participant_count: int = Field(..., description="Number of connected participants")
     
-    class Config:
-        """Pydantic configuration"""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "session_id": "abc123xyz789",
                 "join_url": "http://localhost:3000/session/abc123xyz789",
@@ -80,6 +73,7 @@ class SessionResponse(BaseModel):
                 "participant_count": 1
             }
         }
+    )
 
 
 class ParticipantInfo(BaseModel):
@@ -120,9 +114,8 @@ class SessionDetails(BaseModel):
     current_language: str
     execution_history: List[ExecutionSummary]
     
-    class Config:
-        """Pydantic configuration"""
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "session_id": "abc123xyz789",
                 "join_url": "http://localhost:3000/session/abc123xyz789",
@@ -147,6 +140,7 @@ class SessionDetails(BaseModel):
                 "execution_history": []
             }
         }
+    )
 
 
 class SessionListResponse(BaseModel):
@@ -1,45 +1,35 @@
 """
 WebSocket Message Schemas
 
-Pydantic models for WebSocket messages.
+Models for WebSocket messages.
 These define the structure of messages sent between client and server.
-"""
 
-from datetime import datetime
-from typing import Any, Dict, Literal, Optional, Union
-from pydantic import BaseModel, Field
+Client messages are msgspec Structs tagged by their "type" field, so a raw
+frame is decoded and validated in a single pass by CLIENT_MESSAGE_DECODER.
+"""
 
+from typing import Any, Dict, List, Literal, Optional, Union
 
-# Base message structure
-class WebSocketMessage(BaseModel):
-    """
-    Base class for all WebSocket messages.
-    
-    Every message has a type field that determines how it should be handled.
-    """
-    type: str = Field(..., description="Message type identifier")
-    timestamp: datetime = Field(default_factory=datetime.now)
+import msgspec
+from pydantic import BaseModel
 
 
 # Client to Server Messages
-class JoinSessionMessage(BaseModel):
+class JoinSessionMessage(msgspec.Struct, tag_field="type", tag="join_session"):
     """Client wants to join a session"""
-    type: Literal["join_session"]
     session_id: str
     client_id: str
     display_name: str
 
 
-class LeaveSessionMessage(BaseModel):
+class LeaveSessionMessage(msgspec.Struct, tag_field="type", tag="leave_session"):
     """Client is leaving the session"""
-    type: Literal["leave_session"]
     session_id: str
     client_id: str
 
 
-class CodeUpdateMessage(BaseModel):
+class CodeUpdateMessage(msgspec.Struct, tag_field="type", tag="code_update"):
     """Client is updating the code"""
-    type: Literal["code_update"]
     session_id: str
     client_id: str
     code: str
@@ -47,17 +37,15 @@ class CodeUpdateMessage(BaseModel):
     cursor_position: Optional[Dict[str, int]] = None  # {"line": 10, "column": 5}
 
 
-class LanguageChangeMessage(BaseModel):
+class LanguageChangeMessage(msgspec.Struct, tag_field="type", tag="language_change"):
     """Client is changing the language"""
-    type: Literal["language_change"]
     session_id: str
     client_id: str
     language: str
 
 
-class ExecuteCodeMessage(BaseModel):
+class ExecuteCodeMessage(msgspec.Struct, tag_field="type", tag="execute_code"):
     """Client wants to execute code"""
-    type: Literal["execute_code"]
     session_id: str
     client_id: str
     code: str
@@ -65,6 +53,13 @@ class ExecuteCodeMessage(BaseModel):
 
 
 # Server to Client Messages
+class ParticipantSummary(BaseModel):
+    """A connected participant as listed in presence messages"""
+    client_id: str
+    display_name: str
+    role: str
+
+
 class UserJoinedMessage(BaseModel):
     """Notify clients that a user joined"""
     type: Literal["user_joined"]
@@ -72,7 +67,7 @@ class UserJoinedMessage(BaseModel):
     client_id: str
     display_name: str
     participant_count: int
-    participants: list
+    participants: List[ParticipantSummary]
 
 
 class UserLeftMessage(BaseModel):
@@ -119,7 +114,7 @@ class SessionStateMessage(BaseModel):
     code: str
     language: str
     participant_count: int
-    participants: list
+    participants: List[ParticipantSummary]
 
 
 class ErrorMessage(BaseModel):
@@ -139,6 +134,9 @@ ClientMessage = Union[
     ExecuteCodeMessage
 ]
 
+# Decodes a raw client frame straight into the matching message Struct
+CLIENT_MESSAGE_DECODER = msgspec.json.Decoder(ClientMessage)
+
 ServerMessage = Union[
     UserJoinedMessage,
     UserLeftMessage,
@@ -163,21 +161,7 @@ def parse_client_message(data: dict) -> ClientMessage:
     Raises:
         ValueError: If message type is unknown or data is invalid
     """
-    message_type = data.get("type")
-    
-    if not message_type:
-        raise ValueError("Message must have a 'type' field")
-    
-    message_classes = {
-        "join_session": JoinSessionMessage,
-        "leave_session": LeaveSessionMessage,
-        "code_update": CodeUpdateMessage,
-        "language_change": LanguageChangeMessage,
-        "execute_code": ExecuteCodeMessage,
-    }
-    
-    message_class = message_classes.get(message_type)
-    if not message_class:
-        raise ValueError(f"Unknown message type: {message_type}")
-    
-    return message_class(**data)
+    try:
+        return msgspec.convert(data, ClientMessage)
+    except msgspec.ValidationError as e:
+        raise ValueError(str(e)) from e
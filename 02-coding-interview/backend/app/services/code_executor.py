@@ -11,12 +11,15 @@ SECURITY WARNING: This is a simplified implementation for development.
 In production, use Docker containers or a dedicated execution service.
 """
 
+import hashlib
 import subprocess
+import shutil
 import tempfile
 import os
 import time
 import signal
 import threading
+from collections import OrderedDict
 from typing import Tuple, Optional
 from pathlib import Path
 
@@ -24,6 +27,18 @@ from app.core.config import settings
 from app.models.domain import Language
 
 
+# Cap on stdout/stderr characters returned (and so broadcast) per run
+_MAX_OUTPUT_SIZE = settings.code_max_output_size
+
+# Number of compiled programs kept so re-running a snippet skips the compiler
+_COMPILE_CACHE_SIZE = 32
+
+# Memory-backed directory for interpreted runs, so their source files never
+# touch disk. Compiled runs stay on the default temp dir: Docker mounts
+# /dev/shm noexec, which would stop the compiled binary from starting.
+_TMPFS_DIR = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+
+
 class CodeExecutor:
     """
     Executes code safely with resource limits and timeout protection.
@@ -58,6 +73,14 @@ class CodeExecutor:
         }
     }
     
+    def __init__(self):
+        """Initialize the executor with an empty compile cache"""
+        # Source hash -> directory holding that program's compiled output,
+        # least recently used first
+        self._compiled: "OrderedDict[str, Path]" = OrderedDict()
+        self._compile_cache_dir: Optional[Path] = None
+        self._compile_lock = threading.Lock()
+    
     def execute(
         self,
         code: str,
@@ -86,7 +109,8 @@ class CodeExecutor:
             return "", "", 1, 0, f"Language '{language}' is not supported for execution"
         
         # Create temporary file for code
-        with tempfile.TemporaryDirectory() as tmpdir:
+        run_root = None if config.get("compile") else _TMPFS_DIR
+        with tempfile.TemporaryDirectory(dir=run_root) as tmpdir:
             # Write code to file
             code_file = Path(tmpdir) / f"code{config['extension']}"
             code_file.write_text(code)
@@ -94,9 +118,9 @@ class CodeExecutor:
             try:
                 # Compile if needed
                 if config.get("compile"):
-                    compile_result = self._compile(code_file, config, tmpdir)
+                    compile_result = self._compile_cached(code, code_file, config, tmpdir)
                     if compile_result:
-                        return "", compile_result, 1, 0, "Compilation failed"
+                        return "", self._truncate_output(compile_result), 1, 0, "Compilation failed"
                 
                 # Execute the code
                 return self._run_code(
@@ -148,6 +172,75 @@ class CodeExecutor:
         except Exception as e:
             return f"Compilation error: {str(e)}"
     
+    def _compile_cached(
+        self,
+        code: str,
+        code_file: Path,
+        config: dict,
+        working_dir: str
+    ) -> Optional[str]:
+        """
+        Compile code, reusing the output of an earlier identical compile.
+        
+        Compiled files are copied into working_dir either way, so the run
+        step never shares files with another execution.
+        
+        Args:
+            code: Source code being compiled
+            code_file: Path to source file
+            config: Language configuration
+            working_dir: Working directory
+            
+        Returns:
+            Error message if compilation fails, None if successful
+        """
+        key = hashlib.sha256(f"{config['extension']}\0{code}".encode()).hexdigest()
+        
+        with self._compile_lock:
+            cached = self._compiled.get(key)
+            if cached is not None:
+                self._compiled.move_to_end(key)
+                shutil.copytree(cached, working_dir, dirs_exist_ok=True)
+                return None
+        
+        error = self._compile(code_file, config, working_dir)
+        if error:
+            return error
+        
+        with self._compile_lock:
+            if key not in self._compiled:
+                if self._compile_cache_dir is None:
+                    self._compile_cache_dir = Path(tempfile.mkdtemp(prefix="code-executor-"))
+                
+                # Keep everything the compiler produced, but not the source
+                target = self._compile_cache_dir / key
+                shutil.copytree(
+                    working_dir,
+                    target,
+                    ignore=lambda _, names: [n for n in names if n == code_file.name]
+                )
+                self._compiled[key] = target
+                
+                if len(self._compiled) > _COMPILE_CACHE_SIZE:
+                    # Evicted programs are deleted from disk, not just forgotten
+                    _, evicted = self._compiled.popitem(last=False)
+                    shutil.rmtree(evicted, ignore_errors=True)
+        
+        return None
+    
+    def clear_compile_cache(self) -> None:
+        """
+        Forget all compiled programs and delete the cache directory.
+        
+        Called at application shutdown; the cache is recreated on the
+        next compile if the executor is used again.
+        """
+        with self._compile_lock:
+            self._compiled.clear()
+            if self._compile_cache_dir is not None:
+                shutil.rmtree(self._compile_cache_dir, ignore_errors=True)
+                self._compile_cache_dir = None
+    
     def _run_code(
         self,
         code_file: Path,
@@ -177,6 +270,8 @@ class CodeExecutor:
         
         # Start timer
         start_time = time.time()
+        timeout = time_limit_ms / 1000.0
+        pipe_threads = []
         
         try:
             # Run the process with timeout
@@ -186,29 +281,50 @@ class CodeExecutor:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 cwd=working_dir,
-                text=True,
-                preexec_fn=self._limit_resources if os.name != 'nt' else None
+                preexec_fn=self._limit_resources if os.name != 'nt' else None,
+                start_new_session=True  # Own process group, so a timeout can kill its children too
             )
             
-            # Communicate with timeout
-            stdout, stderr = process.communicate(
-                input=stdin,
-                timeout=time_limit_ms / 1000.0
-            )
+            # Feed stdin and drain both pipes in threads, keeping only as much
+            # output as _decode_output will look at, so a program that prints
+            # without end can't fill memory before the timeout
+            stdout, stderr = bytearray(), bytearray()
+            pipe_threads = [
+                threading.Thread(target=self._feed_stdin, args=(process.stdin, stdin.encode()), daemon=True),
+                threading.Thread(target=self._drain_pipe, args=(process.stdout, stdout), daemon=True),
+                threading.Thread(target=self._drain_pipe, args=(process.stderr, stderr), daemon=True),
+            ]
+            for thread in pipe_threads:
+                thread.start()
+            
+            process.wait(timeout=timeout)
+            # Anything the program left running in the background may still hold the pipes open
+            for thread in pipe_threads:
+                thread.join(max(0.0, start_time + timeout - time.time()))
+            if any(thread.is_alive() for thread in pipe_threads):
+                raise subprocess.TimeoutExpired(cmd, timeout)
             
             # Calculate duration
             duration_ms = int((time.time() - start_time) * 1000)
             
-            # Truncate output if too long
-            stdout = self._truncate_output(stdout)
-            stderr = self._truncate_output(stderr)
+            # Decode only as much output as can survive truncation
+            stdout = self._decode_output(stdout)
+            stderr = self._decode_output(stderr)
             
             return stdout, stderr, process.returncode, duration_ms, None
             
         except subprocess.TimeoutExpired:
-            # Kill the process
-            process.kill()
+            # Kill the whole process group, including anything the program spawned
+            if os.name != 'nt':
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass  # Exited just as the timeout fired
+            else:
+                process.kill()
             process.wait()
+            for thread in pipe_threads:
+                thread.join()
             
             duration_ms = time_limit_ms
             return "", "", -1, duration_ms, f"Execution timed out after {time_limit_ms}ms"
@@ -217,6 +333,39 @@ class CodeExecutor:
             duration_ms = int((time.time() - start_time) * 1000)
             return "", str(e), 1, duration_ms, f"Runtime error: {str(e)}"
     
+    def _feed_stdin(self, pipe, data: bytes) -> None:
+        """
+        Write the program input and close its stdin.
+        
+        Args:
+            pipe: The process's stdin pipe
+            data: Program input
+        """
+        try:
+            with pipe:
+                pipe.write(data)
+        except OSError:
+            pass  # The program exited without reading all of its input
+    
+    def _drain_pipe(self, pipe, buffer: bytearray) -> None:
+        """
+        Read a pipe to EOF, keeping only the bytes _decode_output can use.
+        
+        Output past the cap is read and dropped rather than left in the
+        pipe, so the program never blocks on a full pipe.
+        
+        Args:
+            pipe: The process's stdout or stderr pipe
+            buffer: Receives the kept output
+        """
+        # One byte over the decode window, so truncation is still detected
+        limit = _MAX_OUTPUT_SIZE * 4 + 1
+        with pipe:
+            for chunk in iter(lambda: pipe.read1(65536), b""):
+                room = limit - len(buffer)
+                if room > 0:
+                    buffer += chunk[:room]
+    
     def _limit_resources(self):
         """
         Set resource limits for the subprocess (Unix only).
@@ -244,6 +393,29 @@ class CodeExecutor:
         except:
             pass  # Resource limiting not available
     
+    def _decode_output(self, output: bytes) -> str:
+        """
+        Decode raw process output, skipping bytes that would be truncated.
+        
+        A UTF-8 character is at most 4 bytes, so the first
+        _MAX_OUTPUT_SIZE characters always lie within 4x that many bytes.
+        Line endings are normalised to "\n", as text-mode pipes would.
+        
+        Args:
+            output: Raw output bytes
+            
+        Returns:
+            Decoded, truncated output
+        """
+        if len(output) <= _MAX_OUTPUT_SIZE:
+            text = output.decode(errors="replace")
+        else:
+            # Decode straight from a view so the prefix is not copied first
+            text = str(memoryview(output)[:_MAX_OUTPUT_SIZE * 4], "utf-8", "replace")
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return self._truncate_output(text)
+    
     def _truncate_output(self, output: str) -> str:
         """
         Truncate output if it exceeds maximum size.
@@ -254,9 +426,8 @@ class CodeExecutor:
         Returns:
             Truncated output
         """
-        max_size = settings.code_max_output_size
-        if len(output) > max_size:
-            return output[:max_size] + "\n... (output truncated)"
+        if len(output) > _MAX_OUTPUT_SIZE:
+            return output[:_MAX_OUTPUT_SIZE] + "\n... (output truncated)"
         return output
     
     def _mock_execution(
@@ -8,13 +8,19 @@ It handles:
 - Connection lifecycle
 """
 
-import json
+import asyncio
 import logging
-from typing import Dict, List, Set
+import orjson
+from typing import Dict, Optional, Set, Tuple
 from fastapi import WebSocket, WebSocketDisconnect
 
+from app.core.config import settings
+
 logger = logging.getLogger(__name__)
 
+# How long a code_update waits for newer ones before it is broadcast
+_CODE_UPDATE_DELAY = settings.ws_code_update_coalesce_ms / 1000
+
 
 class ConnectionManager:
     """
@@ -26,46 +32,47 @@ class ConnectionManager:
     
     def __init__(self):
         """Initialize the connection manager"""
-        # Map session_id -> List of WebSocket connections
-        self._connections: Dict[str, List[WebSocket]] = {}
+        # Map session_id -> Set of WebSocket connections
+        self._connections: Dict[str, Set[WebSocket]] = {}
+        
+        # Map WebSocket -> (session_id, client_id) for reverse lookup
+        self._connection_info: Dict[WebSocket, Tuple[str, str]] = {}
+        
+        # Map session_id -> latest queued code_update and the socket to exclude
+        self._pending_code_updates: Dict[str, Tuple[dict, Optional[WebSocket]]] = {}
         
-        # Map connection_id -> (session_id, client_id) for reverse lookup
-        self._connection_info: Dict[str, tuple] = {}
+        # Map session_id -> task that will send the queued code_update
+        self._code_update_flushes: Dict[str, asyncio.Task] = {}
     
     async def connect(
         self,
         websocket: WebSocket,
         session_id: str,
         client_id: str
-    ) -> str:
+    ) -> None:
         """
         Accept a new WebSocket connection.
         
+        The WebSocket itself is the connection's key everywhere, so no
+        separate connection ID is generated.
+        
         Args:
             websocket: WebSocket connection object
             session_id: Session to join
             client_id: Client identifier
-            
-        Returns:
-            Connection ID for this connection
         """
         # Accept the connection
         await websocket.accept()
         
-        # Generate connection ID (using object ID for simplicity)
-        connection_id = str(id(websocket))
-        
         # Add to session connections
         if session_id not in self._connections:
-            self._connections[session_id] = []
-        self._connections[session_id].append(websocket)
+            self._connections[session_id] = set()
+        self._connections[session_id].add(websocket)
         
         # Store connection info
-        self._connection_info[connection_id] = (session_id, client_id)
+        self._connection_info[websocket] = (session_id, client_id)
         
-        logger.info(f"Client {client_id} connected to session {session_id}")
-        
-        return connection_id
+        logger.info("Client %s connected to session %s", client_id, session_id)
     
     def disconnect(self, websocket: WebSocket) -> tuple:
         """
@@ -77,30 +84,23 @@ class ConnectionManager:
         Returns:
             Tuple of (session_id, client_id) for the disconnected client
         """
-        connection_id = str(id(websocket))
-        
-        # Get connection info
-        info = self._connection_info.get(connection_id)
+        # Get and remove connection info
+        info = self._connection_info.pop(websocket, None)
         if not info:
             return None, None
         
         session_id, client_id = info
         
         # Remove from session connections
-        if session_id in self._connections:
-            try:
-                self._connections[session_id].remove(websocket)
-                # Clean up empty session
-                if not self._connections[session_id]:
-                    del self._connections[session_id]
-            except ValueError:
-                pass  # Connection was already removed
+        connections = self._connections.get(session_id)
+        if connections is not None:
+            # discard() is a no-op if the connection was already removed
+            connections.discard(websocket)
+            # Clean up empty session
+            if not connections:
+                del self._connections[session_id]
         
-        # Remove connection info
-        if connection_id in self._connection_info:
-            del self._connection_info[connection_id]
-        
-        logger.info(f"Client {client_id} disconnected from session {session_id}")
+        logger.info("Client %s disconnected from session %s", client_id, session_id)
         
         return session_id, client_id
     
@@ -117,9 +117,9 @@ class ConnectionManager:
             message: Message to send (will be JSON encoded)
         """
         try:
-            await websocket.send_json(message)
+            await websocket.send_text(orjson.dumps(message).decode())
         except Exception as e:
-            logger.error(f"Error sending message to client: {e}")
+            logger.error("Error sending message to client: %s", e)
     
     async def broadcast_to_session(
         self,
@@ -130,33 +130,111 @@ class ConnectionManager:
         """
         Broadcast a message to all clients in a session.
         
+        The message is serialized once and the same text is sent to
+        every recipient.
+        
         Args:
             session_id: Target session
             message: Message to broadcast
             exclude: Optional WebSocket to exclude (usually the sender)
         """
+        # Nothing to encode if the sender is the only one connected
+        connections = self._connections.get(session_id)
+        if not connections or (len(connections) == 1 and exclude in connections):
+            return
+        
+        await self.broadcast_bytes_to_session(
+            session_id,
+            orjson.dumps(message),
+            exclude=exclude
+        )
+    
+    async def broadcast_bytes_to_session(
+        self,
+        session_id: str,
+        data: bytes,
+        exclude: WebSocket = None
+    ) -> None:
+        """
+        Broadcast an already-encoded JSON message to all clients in a session.
+        
+        Args:
+            session_id: Target session
+            data: JSON-encoded message (e.g. from orjson.dumps)
+            exclude: Optional WebSocket to exclude (usually the sender)
+        """
         if session_id not in self._connections:
             return
         
-        # Send to all connections in the session
-        disconnected = []
-        for connection in self._connections[session_id]:
-            if connection == exclude:
-                continue
-            
-            try:
-                await connection.send_json(message)
-            except Exception as e:
-                # Connection is dead, mark for removal
-                logger.error(f"Error broadcasting to client: {e}")
-                disconnected.append(connection)
+        # Sent as a text frame so clients keep receiving JSON strings. The
+        # ASGI message is built once and shared, skipping send_text's
+        # per-recipient wrapper dict
+        message = {"type": "websocket.send", "text": data.decode()}
+        
+        # Send to all connections concurrently so one slow client
+        # doesn't hold up delivery to the rest
+        targets = [c for c in self._connections[session_id] if c is not exclude]
+        results = await asyncio.gather(
+            *(connection.send(message) for connection in targets),
+            return_exceptions=True
+        )
         
         # Clean up dead connections
-        for connection in disconnected:
-            try:
+        for connection, result in zip(targets, results):
+            if isinstance(result, Exception):
+                logger.error("Error broadcasting to client: %s", result)
                 self.disconnect(connection)
-            except:
-                pass
+    
+    def queue_code_update(
+        self,
+        session_id: str,
+        message: dict,
+        exclude: WebSocket = None
+    ) -> asyncio.Task:
+        """
+        Queue a code_update broadcast, coalescing bursts of keystrokes.
+        
+        Code updates carry the whole document, so only the latest one
+        queued within the coalescing window is sent.
+        
+        Args:
+            session_id: Target session
+            message: code_update message to broadcast
+            exclude: Optional WebSocket to exclude (usually the sender)
+            
+        Returns:
+            Task that sends the queued update when the window closes
+        """
+        self._pending_code_updates[session_id] = (message, exclude)
+        
+        task = self._code_update_flushes.get(session_id)
+        if task is None:
+            task = asyncio.create_task(self._flush_code_update_later(session_id))
+            self._code_update_flushes[session_id] = task
+        return task
+    
+    async def _flush_code_update_later(self, session_id: str) -> None:
+        """Send a session's queued code_update once the window closes"""
+        await asyncio.sleep(_CODE_UPDATE_DELAY)
+        # Skip if an explicit flush already sent it and a new window began
+        if self._code_update_flushes.get(session_id) is asyncio.current_task():
+            await self.flush_code_update(session_id)
+    
+    async def flush_code_update(self, session_id: str) -> None:
+        """
+        Send a session's queued code_update right away, if there is one.
+        
+        Call this before broadcasting anything that must not overtake
+        the latest code, such as a language change.
+        
+        Args:
+            session_id: Session to flush
+        """
+        self._code_update_flushes.pop(session_id, None)
+        pending = self._pending_code_updates.pop(session_id, None)
+        if pending is not None:
+            message, exclude = pending
+            await self.broadcast_to_session(session_id, message, exclude=exclude)
     
     async def broadcast_to_all(
         self,
@@ -182,7 +260,7 @@ class ConnectionManager:
         Returns:
             Number of active connections
         """
-        return len(self._connections.get(session_id, []))
+        return len(self._connections.get(session_id, ()))
     
     def get_all_sessions(self) -> Set[str]:
         """
@@ -203,29 +281,25 @@ class ConnectionManager:
         if session_id not in self._connections:
             return
         
-        # Send close message to all connections
-        close_message = {
+        # Send close message to all connections, encoded once
+        close_message = orjson.dumps({
             "type": "session_ended",
             "message": "Session has been ended by the host"
-        }
-        
-        for connection in self._connections[session_id]:
-            try:
-                await connection.send_json(close_message)
-                await connection.close()
-            except:
-                pass  # Connection might already be closed
-        
-        # Clean up
-        del self._connections[session_id]
-        
-        # Remove connection info for these connections
-        to_remove = [
-            cid for cid, (sid, _) in self._connection_info.items()
-            if sid == session_id
-        ]
-        for connection_id in to_remove:
-            del self._connection_info[connection_id]
+        }).decode()
+        
+        async def notify_and_close(connection: WebSocket) -> None:
+            await connection.send_text(close_message)
+            await connection.close()
+        
+        # Connections might already be closed, so failures are ignored
+        await asyncio.gather(
+            *(notify_and_close(connection) for connection in self._connections[session_id]),
+            return_exceptions=True
+        )
+        
+        # Clean up, including connection info for just these connections
+        for connection in self._connections.pop(session_id):
+            self._connection_info.pop(connection, None)
 
 
 # Create a global instance
@@ -10,8 +10,9 @@ This service handles all session-related operations including:
 Currently uses in-memory storage but designed to easily swap to a database.
 """
 
-import random
+import secrets
 import string
+import time
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from threading import Lock
@@ -21,6 +22,54 @@ from app.core.config import settings
 from app.core.exceptions import SessionNotFoundException, SessionFullException
 
 
+# frontend_url never changes at runtime, so build the join URL prefix once
+JOIN_URL_PREFIX = settings.frontend_url + "/session/"
+
+# Session IDs are lowercase alphanumeric; one random draw covers every ID
+SESSION_ID_ALPHABET = string.ascii_lowercase + string.digits
+_SESSION_ID_SPACE = len(SESSION_ID_ALPHABET) ** settings.session_id_length
+
+# Sessions expire after hours, so sweeping for them at most once a minute is plenty
+CLEANUP_INTERVAL_SECONDS = 60.0
+
+# Starter code for new sessions; this would normally come from the language configuration
+DEFAULT_CODE_TEMPLATES: Dict[str, str] = {
+    "javascript": """// Welcome to the coding interview platform!
+// Start writing your JavaScript code here
+
+function solution() {
+  console.log("Hello, World!");
+}
+
+solution();""",
+    "python": """# Welcome to the coding interview platform!
+# Start writing your Python code here
+
+def solution():
+    print("Hello, World!")
+
+solution()""",
+    "java": """// Welcome to the coding interview platform!
+// Start writing your Java code here
+
+public class Main {
+    public static void main(String[] args) {
+        System.out.println("Hello, World!");
+    }
+}""",
+    "cpp": """// Welcome to the coding interview platform!
+// Start writing your C++ code here
+
+#include <iostream>
+using namespace std;
+
+int main() {
+    cout << "Hello, World!" << endl;
+    return 0;
+}"""
+}
+
+
 class SessionManager:
     """
     Manages all active coding sessions.
@@ -52,8 +101,8 @@ class SessionManager:
         # Lock for thread-safe operations
         self._session_lock = Lock()
         
-        # Track execution counts for rate limiting (session_id -> count)
-        self._execution_counts: Dict[str, List[datetime]] = {}
+        # Monotonic time before which _cleanup_old_sessions skips its scan
+        self._next_cleanup_at = 0.0
         
         self._initialized = True
     
@@ -91,20 +140,20 @@ class SessionManager:
             status=SessionStatus.ACTIVE,
             current_code=default_code,
             current_language=initial_language,
-            max_participants=max_participants
+            max_participants=max_participants,
+            join_url=JOIN_URL_PREFIX + session_id
         )
         
         # Store the session (thread-safe)
         with self._session_lock:
             self._sessions[session_id] = session
-            self._execution_counts[session_id] = []
         
         # Clean up old sessions
         self._cleanup_old_sessions()
         
         return session
     
-    def get_session(self, session_id: str) -> Session:
+    def get_session(self, session_id: str) -> Optional[Session]:
         """
         Get a session by ID.
         
@@ -112,13 +161,19 @@ class SessionManager:
             session_id: Unique session identifier
             
         Returns:
-            Session object
-            
+            Session object, or None if it doesn't exist
+        """
+        return self._sessions.get(session_id)
+    
+    def _require_session(self, session_id: str) -> Session:
+        """
+        Get a session by ID for an operation that needs it to exist.
+        
         Raises:
             SessionNotFoundException: If session doesn't exist
         """
         session = self._sessions.get(session_id)
-        if not session:
+        if session is None:
             raise SessionNotFoundException(session_id)
         return session
     
@@ -132,14 +187,15 @@ class SessionManager:
         Returns:
             List of sessions
         """
-        sessions = list(self._sessions.values())
+        # Sessions are inserted as they are created, so dict order is creation
+        # order and reversing it gives newest first without sorting.
+        # Hold the lock only for the snapshot; filter outside it
+        with self._session_lock:
+            sessions = list(reversed(self._sessions.values()))
         
         if status:
             sessions = [s for s in sessions if s.status == status]
         
-        # Sort by creation time (newest first)
-        sessions.sort(key=lambda s: s.created_at, reverse=True)
-        
         return sessions
     
     def update_session_code(
@@ -159,7 +215,7 @@ class SessionManager:
         Returns:
             Updated session
         """
-        session = self.get_session(session_id)
+        session = self._require_session(session_id)
         session.update_code(code, language)
         return session
     
@@ -187,7 +243,7 @@ class SessionManager:
         Raises:
             SessionFullException: If session is at capacity
         """
-        session = self.get_session(session_id)
+        session = self._require_session(session_id)
         
         # Check if session is full (unless rejoining)
         existing = session.get_participant(client_id)
@@ -221,7 +277,7 @@ class SessionManager:
             session_id: Session to leave
             client_id: Client to remove
         """
-        session = self.get_session(session_id)
+        session = self._require_session(session_id)
         session.remove_participant(client_id)
     
     def add_execution_result(
@@ -236,7 +292,7 @@ class SessionManager:
             session_id: Session where code was executed
             result: Execution result to store
         """
-        session = self.get_session(session_id)
+        session = self._require_session(session_id)
         session.add_execution_result(result)
     
     def check_rate_limit(self, session_id: str) -> bool:
@@ -249,25 +305,10 @@ class SessionManager:
         Returns:
             True if within limit, False if exceeded
         """
-        if session_id not in self._execution_counts:
-            self._execution_counts[session_id] = []
-        
-        # Remove executions older than 1 minute
-        now = datetime.now()
-        cutoff = now - timedelta(minutes=1)
-        self._execution_counts[session_id] = [
-            dt for dt in self._execution_counts[session_id]
-            if dt > cutoff
-        ]
-        
-        # Check if under limit
-        current_count = len(self._execution_counts[session_id])
-        if current_count >= settings.rate_limit_executions_per_minute:
-            return False
-        
-        # Add this execution
-        self._execution_counts[session_id].append(now)
-        return True
+        session = self._sessions.get(session_id)
+        if session is None:
+            return True
+        return session.try_record_execution()
     
     def end_session(self, session_id: str) -> None:
         """
@@ -276,7 +317,7 @@ class SessionManager:
         Args:
             session_id: Session to end
         """
-        session = self.get_session(session_id)
+        session = self._require_session(session_id)
         session.status = SessionStatus.COMPLETED
         session.updated_at = datetime.now()
     
@@ -290,8 +331,6 @@ class SessionManager:
         with self._session_lock:
             if session_id in self._sessions:
                 del self._sessions[session_id]
-            if session_id in self._execution_counts:
-                del self._execution_counts[session_id]
     
     def _generate_session_id(self) -> str:
         """
@@ -300,16 +339,17 @@ class SessionManager:
         Returns:
             Random alphanumeric string
         """
+        base = len(SESSION_ID_ALPHABET)
         while True:
-            # Generate random string
-            session_id = ''.join(
-                random.choices(
-                    string.ascii_lowercase + string.digits,
-                    k=settings.session_id_length
-                )
-            )
+            # Draw one secure random number and spell it in the ID alphabet
+            n = secrets.randbelow(_SESSION_ID_SPACE)
+            chars = []
+            for _ in range(settings.session_id_length):
+                n, digit = divmod(n, base)
+                chars.append(SESSION_ID_ALPHABET[digit])
+            session_id = ''.join(chars)
             
-            # Ensure it's unique
+            # Ensure it's unique (a collision is astronomically unlikely)
             if session_id not in self._sessions:
                 return session_id
     
@@ -323,54 +363,24 @@ class SessionManager:
         Returns:
             Default code template
         """
-        # This would normally come from the language configuration
-        templates = {
-            "javascript": """// Welcome to the coding interview platform!
-// Start writing your JavaScript code here
-
-function solution() {
-  console.log("Hello, World!");
-}
-
-solution();""",
-            "python": """# Welcome to the coding interview platform!
-# Start writing your Python code here
-
-def solution():
-    print("Hello, World!")
-
-solution()""",
-            "java": """// Welcome to the coding interview platform!
-// Start writing your Java code here
-
-public class Main {
-    public static void main(String[] args) {
-        System.out.println("Hello, World!");
-    }
-}""",
-            "cpp": """// Welcome to the coding interview platform!
-// Start writing your C++ code here
-
-#include <iostream>
-using namespace std;
-
-int main() {
-    cout << "Hello, World!" << endl;
-    return 0;
-}"""
-        }
-        
-        return templates.get(language, "// Start coding here...")
+        return DEFAULT_CODE_TEMPLATES.get(language, "// Start coding here...")
     
     def _cleanup_old_sessions(self) -> None:
         """
         Remove sessions older than configured max age.
         
-        This prevents memory leaks from abandoned sessions.
+        This prevents memory leaks from abandoned sessions. The scan covers
+        every session, so it runs at most once per CLEANUP_INTERVAL_SECONDS
+        rather than on every create.
         """
         if len(self._sessions) < 100:  # Only cleanup if we have many sessions
             return
         
+        now = time.monotonic()
+        if now < self._next_cleanup_at:
+            return
+        self._next_cleanup_at = now + CLEANUP_INTERVAL_SECONDS
+        
         cutoff = datetime.now() - timedelta(hours=settings.max_session_age_hours)
         
         with self._session_lock:
@@ -383,8 +393,6 @@ int main() {
             # Delete them
             for session_id in old_sessions:
                 del self._sessions[session_id]
-                if session_id in self._execution_counts:
-                    del self._execution_counts[session_id]
 
 
 # Create a global instance
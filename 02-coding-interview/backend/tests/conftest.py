@@ -45,7 +45,6 @@ def session_manager() -> SessionManager:
     
     # Clear any existing sessions
     manager._sessions.clear()
-    manager._execution_counts.clear()
     
     return manager
 
@@ -4,8 +4,15 @@ Tests for Code Execution
 Tests for safely executing code with resource limits.
 """
 
+import sys
+
 import pytest
 
+from app.core.config import settings
+from app.services import code_executor as code_executor_module
+from app.models.domain import Session
+from app.services.code_executor import CodeExecutor, _MAX_OUTPUT_SIZE
+
 
 @pytest.mark.unit
 def test_execute_simple_code(client, api_base_url):
@@ -119,3 +126,206 @@ def test_rate_limiting(client, api_base_url):
     
     # We should hit the rate limit before executing all 15
     assert success_count < 15
+
+
+@pytest.mark.unit
+def test_session_rate_limit(session_manager):
+    """
+    Test the per-session execution rate limit.
+    
+    A session should allow exactly the configured number of executions
+    per window, whether or not it was built by the session manager.
+    """
+    limit = settings.rate_limit_executions_per_minute
+    
+    session = session_manager.create_session()
+    results = [session_manager.check_rate_limit(session.session_id) for _ in range(limit + 5)]
+    assert results == [True] * limit + [False] * 5
+    
+    # A directly constructed session enforces the same limit
+    bare = Session(session_id="bare", created_at=session.created_at, host_name="Host")
+    results = [bare.try_record_execution() for _ in range(limit + 1)]
+    assert results == [True] * limit + [False]
+
+
+@pytest.mark.unit
+def test_execute_language_validation(client, api_base_url):
+    """
+    Test language validation on execute requests.
+    
+    Language ids match case-insensitively; ones the executor cannot run
+    are rejected with a message listing the supported ids.
+    """
+    create_response = client.post(f"{api_base_url}/sessions")
+    session_id = create_response.json()["session_id"]
+    
+    response = client.post(
+        f"{api_base_url}/sessions/{session_id}/execute",
+        json={"code": "print(1)", "language": "PYTHON"}
+    )
+    assert response.status_code == 200
+    assert response.json()["language"] == "python"
+    
+    # Unknown ids, and known languages the executor cannot run, are rejected
+    for language in ("cobol", "typescript"):
+        response = client.post(
+            f"{api_base_url}/sessions/{session_id}/execute",
+            json={"code": "print(1)", "language": language}
+        )
+        assert response.status_code == 422
+        assert "'python'" in response.text
+        assert "pattern" not in response.text
+
+
+@pytest.mark.unit
+def test_decode_output():
+    """
+    Test decoding and truncation of raw process output.
+    
+    Output is cut to the configured size with a marker appended, and
+    line endings are normalised like text-mode pipes.
+    """
+    executor = CodeExecutor()
+    
+    assert executor._decode_output(b"a\r\nb\rc\n") == "a\nb\nc\n"
+    assert executor._decode_output(b"x" * _MAX_OUTPUT_SIZE) == "x" * _MAX_OUTPUT_SIZE
+    
+    truncated = executor._decode_output("é".encode() * (_MAX_OUTPUT_SIZE + 1))
+    assert truncated == "é" * _MAX_OUTPUT_SIZE + "\n... (output truncated)"
+
+
+
+@pytest.mark.unit
+def test_run_code_caps_buffered_output(tmp_path):
+    """
+    Test that a program printing past the output limit is read in bounded memory.
+    
+    The program still runs to completion with its own exit code, and
+    output past the decode window is dropped as it is read.
+    """
+    executor = CodeExecutor()
+    code_file = tmp_path / "code.py"
+    code_file.write_text(
+        "import sys\n"
+        "sys.stdout.write(sys.stdin.read() * (2 * 1024 * 1024))\n"
+        "sys.exit(3)\n"
+    )
+    config = {"command": [sys.executable]}
+    
+    kept = []
+    drain_pipe = executor._drain_pipe
+    
+    def recording_drain(pipe, buffer):
+        drain_pipe(pipe, buffer)
+        kept.append(len(buffer))
+    
+    executor._drain_pipe = recording_drain
+    stdout, stderr, exit_code, _, error = executor._run_code(
+        code_file, config, "ab", 10000, str(tmp_path)
+    )
+    
+    assert error is None
+    assert exit_code == 3
+    assert stdout == "ab" * (_MAX_OUTPUT_SIZE // 2) + "\n... (output truncated)"
+    assert stderr == ""
+    assert max(kept) == _MAX_OUTPUT_SIZE * 4 + 1
+
+def _fake_compile(code_file, config, working_dir):
+    """Stand-in for the compiler: writes a binary named after the source"""
+    (code_file.parent / "a.out").write_text(code_file.read_text())
+    return None
+
+
+def _compile_in(executor, tmp_path, name, code):
+    """Compile code through the cache in a fresh working directory"""
+    working_dir = tmp_path / name
+    working_dir.mkdir()
+    code_file = working_dir / "code.cpp"
+    code_file.write_text(code)
+    config = CodeExecutor.LANGUAGE_CONFIG["cpp"]
+    return executor._compile_cached(code, code_file, config, str(working_dir))
+
+
+@pytest.mark.unit
+def test_compile_cache_cleanup(tmp_path, monkeypatch):
+    """
+    Test that the compile cache does not leave files behind.
+    
+    Evicted programs are deleted, and clearing the cache removes its
+    directory.
+    """
+    monkeypatch.setattr(code_executor_module, "_COMPILE_CACHE_SIZE", 1)
+    executor = CodeExecutor()
+    monkeypatch.setattr(executor, "_compile", _fake_compile)
+    
+    assert _compile_in(executor, tmp_path, "first", "int main() { return 1; }") is None
+    (first,) = executor._compiled.values()
+    assert (first / "a.out").exists()
+    assert not (first / "code.cpp").exists()
+    
+    assert _compile_in(executor, tmp_path, "second", "int main() { return 2; }") is None
+    assert not first.exists()
+    
+    cache_dir = executor._compile_cache_dir
+    executor.clear_compile_cache()
+    assert not cache_dir.exists()
+    assert not executor._compiled
+
+
+@pytest.mark.unit
+def test_execute_malformed_body(client, api_base_url):
+    """
+    Test validation errors for bodies that are not a request object.
+    
+    Invalid JSON and non-object bodies get the usual 422 error shape.
+    """
+    create_response = client.post(f"{api_base_url}/sessions")
+    session_id = create_response.json()["session_id"]
+    url = f"{api_base_url}/sessions/{session_id}/execute"
+    headers = {"Content-Type": "application/json"}
+    
+    cases = [
+        (b"{not json", "json_invalid"),
+        (b"[1, 2]", "model_type"),
+    ]
+    for body, error_type in cases:
+        response = client.post(url, content=body, headers=headers)
+        
+        assert response.status_code == 422
+        data = response.json()
+        assert data["error"] == "VALIDATION_ERROR"
+        assert [e["type"] for e in data["details"]["errors"]] == [error_type]
+    
+    # Field errors keep their field name, without the "body" prefix
+    response = client.post(url, json={"language": "python"})
+    assert response.status_code == 422
+    assert response.json()["details"]["errors"][0]["field"] == "code"
+
+
+@pytest.mark.unit
+def test_compile_cache_hit(tmp_path, monkeypatch):
+    """
+    Test that identical source is compiled only once.
+    
+    A cache hit copies the earlier compiler output into the new working
+    directory instead of invoking the compiler.
+    """
+    executor = CodeExecutor()
+    calls = []
+    
+    def counting_compile(code_file, config, working_dir):
+        calls.append(code_file)
+        return _fake_compile(code_file, config, working_dir)
+    
+    monkeypatch.setattr(executor, "_compile", counting_compile)
+    source = "int main() { return 0; }"
+    
+    assert _compile_in(executor, tmp_path, "first", source) is None
+    assert _compile_in(executor, tmp_path, "second", source) is None
+    assert len(calls) == 1
+    assert (tmp_path / "second" / "a.out").read_text() == source
+    
+    assert _compile_in(executor, tmp_path, "third", source + "\n") is None
+    assert len(calls) == 2
+    
+    executor.clear_compile_cache()
@@ -5,6 +5,10 @@ Simple tests to verify the API is running correctly.
 """
 
 import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import mount_frontend
 
 
 @pytest.mark.unit
@@ -39,3 +43,38 @@ def test_root_endpoint(client):
     assert "version" in data
     assert "documentation" in data
     assert "endpoints" in data
+
+
+@pytest.mark.unit
+def test_frontend_assets_cached(tmp_path):
+    """
+    Test serving frontend build assets from memory.
+    
+    Assets carry a strong ETag and long-lived caching headers, and a
+    matching If-None-Match gets 304 with no body.
+    """
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "app.js").write_text("console.log('hi');")
+    (tmp_path / "index.html").write_text("<html></html>")
+    
+    frontend_app = FastAPI()
+    mount_frontend(frontend_app, str(tmp_path))
+    client = TestClient(frontend_app)
+    
+    response = client.get("/assets/app.js")
+    assert response.status_code == 200
+    assert response.text == "console.log('hi');"
+    assert "javascript" in response.headers["content-type"]
+    assert "immutable" in response.headers["cache-control"]
+    etag = response.headers["etag"]
+    
+    response = client.get("/assets/app.js", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    
+    response = client.get("/assets/app.js", headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    
+    assert client.get("/assets/missing.js").status_code == 404
+    assert client.get("/some/route").text == "<html></html>"
@@ -11,10 +11,13 @@ import json
 from typing import List, Dict, Any
 from fastapi.testclient import TestClient
 from websocket import create_connection, WebSocket
+import importlib.util
 import threading
 import time
+from pathlib import Path
 
 from app.main import app
+from app.services.connection_manager import ConnectionManager
 from app.services.session_manager import session_manager
 
 
@@ -713,3 +716,139 @@ def function_{i}(x):
         session_data = client.get(f"/api/v1/sessions/{session_id}").json()
         # Code might be truncated in response but should be stored
         assert len(session_data["current_code"]) > 0
+
+
+class RecordingWebSocket:
+    """Stand-in WebSocket that records the messages broadcast to it."""
+    
+    def __init__(self):
+        self.received = []
+    
+    async def accept(self):
+        pass
+    
+    async def send(self, message: dict):
+        self.received.append(json.loads(message["text"]))
+
+
+@pytest.mark.websocket
+class TestWebSocketMessages:
+    """Test WebSocket message handling in-process, without a live server."""
+    
+    def test_invalid_client_messages(self, client):
+        """
+        Test that undecodable or invalid messages get an error reply.
+        
+        Each bad message is answered with an error and the connection
+        stays usable afterwards.
+        """
+        session_id = client.post("/api/v1/sessions").json()["session_id"]
+        
+        with client.websocket_connect(f"/ws/sessions/{session_id}") as ws:
+            ws.send_text("{not json")
+            error = ws.receive_json()
+            assert error["type"] == "error"
+            assert error["data"]["code"] == "INVALID_JSON"
+            assert isinstance(error["timestamp"], str)
+            
+            # Unknown type, then a known type with a field missing
+            for message in (
+                {"type": "dance", "session_id": session_id},
+                {"type": "join_session", "session_id": session_id, "client_id": "c1"},
+            ):
+                ws.send_json(message)
+                error = ws.receive_json()
+                assert error["type"] == "error"
+                assert error["data"]["code"] == "INVALID_MESSAGE"
+            
+            ws.send_json({
+                "type": "join_session",
+                "session_id": session_id,
+                "client_id": "c1",
+                "display_name": "Alice"
+            })
+            state = ws.receive_json()
+            assert state["type"] == "session_state"
+            assert state["data"]["participant_count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_code_updates_are_coalesced(self):
+        """
+        Test that a burst of code updates is broadcast once.
+        
+        Only the latest queued update is sent when the window closes,
+        and an explicit flush sends a pending update straight away.
+        """
+        manager = ConnectionManager()
+        sender, receiver = RecordingWebSocket(), RecordingWebSocket()
+        await manager.connect(sender, "s1", "alice")
+        await manager.connect(receiver, "s1", "bob")
+        
+        for i in range(3):
+            flush = manager.queue_code_update(
+                "s1", {"type": "code_update", "code": f"v{i}"}, exclude=sender
+            )
+        await flush
+        
+        assert receiver.received == [{"type": "code_update", "code": "v2"}]
+        assert sender.received == []
+        
+        # A final update flushed explicitly is sent once, not again by the timer
+        flush = manager.queue_code_update(
+            "s1", {"type": "code_update", "code": "final"}, exclude=sender
+        )
+        await manager.flush_code_update("s1")
+        assert receiver.received[-1] == {"type": "code_update", "code": "final"}
+        
+        await flush
+        assert len(receiver.received) == 2
+
+
+@pytest.fixture
+def backend_example():
+    """Load the standalone backend-example.py app next to the backend."""
+    pytest.importorskip("msgpack")
+    path = Path(__file__).resolve().parents[2] / "backend-example.py"
+    spec = importlib.util.spec_from_file_location("backend_example", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.websocket
+class TestBackendExample:
+    """Test the WebSocket endpoint of backend-example.py."""
+    
+    def test_code_update_during_flush_is_delivered(self, backend_example, monkeypatch):
+        """
+        Test that an edit arriving mid-flush is still stored and broadcast.
+        
+        The first flush is slowed down so the second code_update arrives
+        while it is still in progress.
+        """
+        store = backend_example.update_session
+        
+        async def slow_update_session(session_id, **changes):
+            await asyncio.sleep(0.15)
+            await store(session_id, **changes)
+        
+        monkeypatch.setattr(backend_example, "update_session", slow_update_session)
+        
+        client = TestClient(backend_example.app)
+        session_id = client.post("/api/v1/sessions", json={}).json()["sessionId"]
+        
+        with client.websocket_connect(f"/ws/sessions/{session_id}") as sender:
+            sender.receive_json()
+            with client.websocket_connect(f"/ws/sessions/{session_id}") as peer:
+                peer.receive_json()
+                sender.receive_json()  # user_joined
+                
+                sender.send_json({"type": "code_update", "data": {"code": "v1"}})
+                time.sleep(0.08)  # First flush is now inside update_session
+                sender.send_json({"type": "code_update", "data": {"code": "v2"}})
+                time.sleep(0.5)
+                
+                session = client.get(f"/api/v1/sessions/{session_id}").json()
+                assert session["currentCode"] == "v2"
+                assert peer.receive_json()["data"]["code"] == "v1"
+                assert peer.receive_json()["data"]["code"] == "v2"
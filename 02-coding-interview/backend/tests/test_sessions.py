@@ -7,6 +7,8 @@ Tests for creating, fetching, and managing coding sessions.
 import pytest
 from datetime import datetime
 
+from app.models.domain import Participant, ParticipantRole, Session, SessionStatus
+
 
 @pytest.mark.unit
 def test_create_session(client, api_base_url):
@@ -150,3 +152,56 @@ def test_end_session(client, api_base_url):
     # Verify session status changed
     get_response = client.get(f"{api_base_url}/sessions/{session_id}")
     assert get_response.json()["status"] == "completed"
+
+
+@pytest.mark.unit
+def test_session_caches_are_not_fields():
+    """
+    Test that Session's derived caches stay out of its fields.
+    
+    Warming the caches must not change equality or repr, and the
+    connected count must reflect participants passed to the constructor.
+    """
+    created = datetime(2024, 1, 1)
+    participant = Participant(
+        client_id="c1",
+        display_name="Alice",
+        role=ParticipantRole.HOST,
+        joined_at=created
+    )
+    
+    def make() -> Session:
+        return Session(
+            session_id="s1",
+            created_at=created,
+            updated_at=created,
+            host_name="Alice",
+            participants={"c1": participant}
+        )
+    
+    warm, cold = make(), make()
+    warm.connected_participants_json()
+    
+    assert warm == cold
+    assert repr(warm) == repr(cold)
+    assert warm.participant_count == 1
+    
+    with pytest.raises(TypeError):
+        Session(session_id="s2", created_at=created, host_name="Bob", _connected_count=3)
+
+
+@pytest.mark.unit
+def test_list_sessions_newest_first(session_manager):
+    """
+    Test that the manager lists sessions newest first.
+    
+    The order comes from creation order, with or without a status filter.
+    """
+    created = [session_manager.create_session(host_name=f"Host {i}") for i in range(4)]
+    session_manager.end_session(created[1].session_id)
+    
+    listed = [s.session_id for s in session_manager.list_sessions()]
+    assert listed == [s.session_id for s in reversed(created)]
+    
+    active = [s.session_id for s in session_manager.list_sessions(status=SessionStatus.ACTIVE)]
+    assert active == [created[3].session_id, created[2].session_id, created[0].session_id]